@@ -0,0 +1,280 @@
+import contextvars
+import io
+import math
+import queue
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from profiler import stage
+from startup import lazy_import
+
+
+# WAV sample formats that can be read in place: subtype -> (dtype, offset, scale) to float
+_MAPPABLE_SUBTYPES = {
+    'PCM_U8': ('u1', -128.0, 1 / 128),
+    'PCM_16': ('<i2', 0.0, 1 / 2 ** 15),
+    'PCM_32': ('<i4', 0.0, 1 / 2 ** 31),
+    'FLOAT': ('<f4', 0.0, 1.0),
+    'DOUBLE': ('<f8', 0.0, 1.0),
+}
+
+def _wav_data_chunk(path):
+    """ (byte offset, byte size) of the sample data of a RIFF WAV file, or None """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:] != b'WAVE':
+            return None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            size = int.from_bytes(chunk[4:], 'little')
+            if chunk[:4] == b'data':
+                return f.tell(), size
+            f.seek(size + (size & 1), 1)  # Chunks are padded to an even size
+
+def _memory_map(path, info):
+    """ (frames, channels) memory map of an uncompressed WAV file's samples with their conversion, or None """
+    if info.format not in ('WAV', 'WAVEX') or info.subtype not in _MAPPABLE_SUBTYPES:
+        return None
+    chunk = _wav_data_chunk(path)
+    if chunk is None:
+        return None
+    dtype, offset, scale = _MAPPABLE_SUBTYPES[info.subtype]
+    frames = min(info.frames, chunk[1] // (np.dtype(dtype).itemsize * info.channels))
+    if frames == 0:
+        return None
+    samples = np.memmap(path, dtype=dtype, mode='r', offset=chunk[0], shape=(frames, info.channels))
+    return samples, offset, scale
+
+def _decode_mono(path, frames_hint, block_frames):
+    """
+    float32 mono samples of a whole file, decoded block by block into one buffer.
+    The header's frame count is only a hint: compressed formats (MP3) may decode fewer or more.
+    """
+    samples = np.empty(max(frames_hint, 0), dtype=np.float32)
+    frames = 0
+    with sf.SoundFile(path) as f:
+        while True:
+            block = f.read(block_frames, dtype='float32', always_2d=True)
+            if not len(block):
+                break
+            mono = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+            if frames + len(mono) > len(samples):
+                grown = np.empty(frames + max(len(mono), frames // 4), dtype=np.float32)
+                grown[:frames] = samples[:frames]
+                samples = grown
+            samples[frames:frames + len(mono)] = mono
+            frames += len(mono)
+    return samples[:frames]
+
+
+class DecodedAudio:
+    """
+    An input file decoded at most once: float32 mono samples at the native rate,
+    plus cached resampled views (e.g. the model's 22.05 kHz) and an in-memory WAV for playback.
+
+    Uncompressed WAV data is memory-mapped and converted and downmixed block by block when
+    read, so length, the plot envelope and the resampled views never hold the whole
+    native-rate signal. Other formats are decoded once, block by block, into a float32 mono
+    buffer that every view reads from.
+    """
+    BLOCK_FRAMES = 2 ** 20
+
+    def __init__(self, path, samples, sr):
+        self.path = path
+        self._samples = samples  # float32 mono samples, or None while read lazily from path
+        self._frames = None if samples is None else len(samples)
+        self._map = None  # (memory map, offset, scale) of an uncompressed WAV file
+        self.sr = sr
+        self._resampled = {}
+        self._wav_bytes = None
+
+    @classmethod
+    def from_file(cls, path):
+        """ Uncompressed WAV: only reads the header, samples are read when needed. Other formats: decodes once """
+        info = sf.info(path)
+        memory_map = _memory_map(path, info)
+        if memory_map is None:
+            return cls(path, _decode_mono(path, info.frames, cls.BLOCK_FRAMES), info.samplerate)
+        audio = cls(path, None, info.samplerate)
+        audio._map = memory_map
+        audio._frames = len(memory_map[0])
+        return audio
+
+    def __len__(self):
+        return self._frames
+
+    @property
+    def duration(self):
+        return self._frames / self.sr
+
+    def read(self, start=0, stop=None):
+        """ float32 mono samples start..stop """
+        stop = self._frames if stop is None else min(stop, self._frames)
+        if self._samples is not None:
+            return self._samples[start:stop]
+        samples, offset, scale = self._map
+        block = samples[start:stop].astype(np.float32)
+        if offset:
+            block += np.float32(offset)
+        block *= np.float32(scale)
+        return block[:, 0] if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+
+    def blocks(self, block_frames=None):
+        """ float32 mono samples in consecutive blocks """
+        block_frames = block_frames or self.BLOCK_FRAMES
+        for start in range(0, self._frames, block_frames):
+            yield self.read(start, start + block_frames)
+
+    @property
+    def samples(self):
+        """ Every float32 mono sample; for long inputs, prefer blocks() or envelope() """
+        if self._samples is not None:
+            return self._samples
+        if self._map is not None and self._map[0].shape[1] == 1 and self._map[0].dtype == np.float32:
+            return self._map[0][:, 0]  # Already float32 mono: no copy needed
+        samples = np.empty(self._frames, dtype=np.float32)
+        for start, block in zip(range(0, self._frames, self.BLOCK_FRAMES), self.blocks()):
+            samples[start:start + len(block)] = block
+        return samples
+
+    def envelope(self, buckets=4096):
+        """
+        Minimum and maximum of each of about `buckets` stretches of samples, interleaved,
+        with the rate at which they stand: enough to draw the waveform at screen resolution.
+        """
+        bucket = max(1, -(-self._frames // buckets))
+        block_frames = max(1, self.BLOCK_FRAMES // bucket) * bucket  # Buckets never straddle blocks
+        points = []
+        for block in self.blocks(block_frames):
+            if not len(block):
+                continue
+            pad = -len(block) % bucket
+            if pad:
+                block = np.concatenate([block, np.full(pad, block[-1], dtype=np.float32)])
+            block = block.reshape(-1, bucket)
+            points.append(np.stack([block.min(axis=1), block.max(axis=1)], axis=1).ravel())
+        points = np.concatenate(points) if points else np.zeros(0, dtype=np.float32)
+        return points, 2 * self.sr / bucket
+
+    def resampled_length(self, target_sr):
+        """ Number of samples at target_sr """
+        return -(-self._frames * target_sr // self.sr)
+
+    def resampled_blocks(self, target_sr):
+        """
+        Samples at target_sr in consecutive blocks, resampled as they are consumed.
+        Blocks are resampled with enough surrounding samples that their edges match
+        resampling the whole signal.
+        """
+        if target_sr == self.sr:
+            yield from self.blocks()
+            return
+        if target_sr in self._resampled:
+            yield self._resampled[target_sr]
+            return
+        librosa = lazy_import("librosa")
+        # Blocks start on samples that land exactly on an output sample
+        step = self.sr // math.gcd(self.sr, target_sr)
+        block_frames = max(1, self.BLOCK_FRAMES // step) * step
+        margin = -(-4096 // step) * step
+        for start in range(0, self._frames, block_frames):
+            stop = min(start + block_frames, self._frames)
+            lo = max(0, start - margin)
+            block = librosa.resample(self.read(lo, stop + margin), orig_sr=self.sr, target_sr=target_sr)
+            first, last = start * target_sr // self.sr, -(-stop * target_sr // self.sr)
+            skip = first - lo * target_sr // self.sr
+            yield block[skip:skip + last - first]
+
+    def resampled(self, target_sr):
+        """ Samples at target_sr, computed on first use and cached """
+        if target_sr == self.sr:
+            return self.samples
+        if target_sr not in self._resampled:
+            resampled = np.empty(self.resampled_length(target_sr), dtype=np.float32)
+            start = 0
+            for block in self.resampled_blocks(target_sr):
+                resampled[start:start + len(block)] = block
+                start += len(block)
+            self._resampled[target_sr] = resampled
+        return self._resampled[target_sr]
+
+    def wav_bytes(self):
+        """
+        16-bit mono WAV encoding of the samples, for players that need a file-like source.
+        Holds the whole input in memory: uncompressed inputs are better played from their file.
+        """
+        if self._wav_bytes is None:
+            buffer = io.BytesIO()
+            with sf.SoundFile(buffer, 'w', samplerate=self.sr, channels=1, format='WAV', subtype='PCM_16') as f:
+                for block in self.blocks():
+                    f.write(block)
+            self._wav_bytes = buffer.getvalue()
+        return self._wav_bytes
+
+
+class BlockWriter:
+    """
+    Encodes audio blocks into a file on a background thread, so encoding (FLAC, MP3)
+    overlaps with rendering the next blocks instead of following it.
+
+    put() hands a block over through a queue of at most max_blocks blocks and waits while
+    it is full, so a slow encoder holds back rendering instead of buffering the whole file.
+    The first encoding error is raised by the next put() and by close(); blocks arriving
+    after it are dropped. on_done(error), if given, is called on the writer thread once the
+    file is closed, with None on success.
+
+    Blocks must not be modified after put(). The thread runs in a copy of the caller's
+    context, so its writes are recorded as file write stages when profiling.
+    """
+    def __init__(self, output_path, sr, subtype=None, max_blocks=4, on_done=None):
+        self.output_path = output_path
+        self.error = None
+        self._queue = queue.Queue(max_blocks)
+        self._on_done = on_done
+        self._file = sf.SoundFile(output_path, 'w', samplerate=sr, channels=1, subtype=subtype)
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,),
+                                        name="output writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with self._file as f:
+                while (block := self._queue.get()) is not None:
+                    if self.error is None:
+                        try:
+                            with stage("file write"):
+                                f.write(block)
+                        except Exception as e:
+                            self.error = e  # Keep draining, so put() never waits on a dead writer
+        except Exception as e:  # Closing flushes the encoder, which can fail too
+            self.error = self.error or e
+        if self._on_done is not None:
+            self._on_done(self.error)
+
+    def put(self, block):
+        if self.error is not None:
+            raise self.error
+        self._queue.put(block)
+
+    def close(self):
+        """ Wait until every block is written and the file is closed; raises the writer's error """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Already failing: finish the file, but keep the original exception
+            self._queue.put(None)
+            self._thread.join()
@@ -0,0 +1,161 @@
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core import order_events, to_events, to_events_batch, to_8_bit_channels, write_8_bit, write_blocks, split_blocks
+from event_array import EventArray
+from transcription_cache import TranscriptionCache
+
+INPUT_EXTENSIONS = (".wav", ".mp3", ".flac")
+
+def collect_inputs(pattern):
+    """ Audio files in a directory, or matching a glob pattern, in name order """
+    if os.path.isdir(pattern):
+        paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+    else:
+        paths = glob.glob(pattern)
+    return sorted(p for p in paths
+                  if os.path.isfile(p) and os.path.splitext(p)[1].lower() in INPUT_EXTENSIONS)
+
+def output_path_for(input_path, output_dir, output_format):
+    """ <output_dir>/<input name>_8bit.<output_format> """
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{name}_8bit.{output_format}")
+
+# Most inputs one worker transcribes together, sharing model batches
+GROUP_SIZE = 8
+
+def convert_file(input_path, output_path, sr, use_cache=True, threads=None, backend="basic-pitch", ordering="auto",
+                 **render):
+    """
+    Transcription (with the given TRANSCRIPTION_BACKENDS backend), ordering (with the given
+    order_events strategy), synthesis and encoding of one file.
+    render holds the write_8_bit options (engine, pool, internal_sr, bit_depth, subtype).
+    Returns the number of events and per-stage timings in seconds.
+    """
+    cache = TranscriptionCache() if use_cache else None
+
+    t0 = time.perf_counter()
+    channel_events = to_events(input_path, by_instrument=True, cache=cache, backend=backend)
+    transcription = time.perf_counter() - t0
+
+    num_events, timings = render_file(channel_events, output_path, sr, threads, ordering, **render)
+    return num_events, {"transcription": transcription, **timings}
+
+def render_file(channel_events, output_path, sr, threads=None, ordering="auto", **render):
+    """ The stages of convert_file after transcription; returns the number of events and their timings """
+    timings = {}
+    t0 = time.perf_counter()
+    render_sr = render.get("internal_sr") or sr
+    if threads is not None:
+        channel_events = [order_events(channel, render_sr, ordering)[0] for channel in channel_events]
+        num_events = sum(len(channel) for channel in channel_events)
+    else:
+        events, _ = order_events(EventArray.concatenate(channel_events), render_sr, ordering)
+        num_events = len(events)
+    timings["ordering"] = time.perf_counter() - t0
+
+    # Synthesis and encoding are interleaved block by block
+    t0 = time.perf_counter()
+    if threads is not None:
+        render.pop("pool", None)  # Voice pools are not used with per-channel threads
+        subtype = render.pop("subtype", None)
+        output_data = to_8_bit_channels(channel_events, sr, workers=threads, **render)
+        write_blocks(output_path, split_blocks(output_data), sr, subtype=subtype)
+    else:
+        write_8_bit(output_path, events, sr, **render)
+    timings["synthesis"] = time.perf_counter() - t0
+
+    return num_events, timings
+
+def _convert_job(input_path, output_path, sr, use_cache, threads, backend, ordering, render):
+    """ Process pool entry point: never raises, failures are reported in the result """
+    t0 = time.perf_counter()
+    result = {"input": input_path, "output": output_path, "events": 0, "timings": {}, "error": None}
+    try:
+        result["events"], result["timings"] = convert_file(input_path, output_path, sr, use_cache, threads, backend,
+                                                            ordering, **render)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["total"] = time.perf_counter() - t0
+    return result
+
+def _convert_group_job(jobs, sr, use_cache, threads, backend, ordering, render):
+    """
+    Process pool entry point for several (input_path, output_path) jobs: one to_events_batch
+    call transcribes them all, so short inputs fill model batches together. Each result
+    reports an equal share of the transcription time. If the shared transcription fails,
+    the files are converted one by one, so the error is reported for the file that caused it.
+    """
+    t0 = time.perf_counter()
+    cache = TranscriptionCache() if use_cache else None
+    try:
+        transcribed = to_events_batch([input_path for input_path, _ in jobs], by_instrument=True, cache=cache,
+                                      backend=backend)
+    except Exception:
+        return [_convert_job(input_path, output_path, sr, use_cache, threads, backend, ordering, render)
+                for input_path, output_path in jobs]
+    transcription = (time.perf_counter() - t0) / len(jobs)
+
+    results = []
+    for (input_path, output_path), channel_events in zip(jobs, transcribed):
+        t0 = time.perf_counter()
+        result = {"input": input_path, "output": output_path, "events": 0,
+                  "timings": {"transcription": transcription}, "error": None}
+        try:
+            result["events"], timings = render_file(channel_events, output_path, sr, threads, ordering, **render)
+            result["timings"].update(timings)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["total"] = transcription + time.perf_counter() - t0
+        results.append(result)
+    return results
+
+def run_batch(inputs, output_dir, output_format, sr, workers=None, use_cache=True, threads=None,
+              backend="basic-pitch", ordering="auto", on_result=None, **render):
+    """
+    Convert every input on a process pool of `workers` processes. Each worker takes a group
+    of up to GROUP_SIZE inputs (fewer when there are not enough to keep every worker busy)
+    and transcribes them together.
+    on_result is called with each result as soon as its group finishes.
+    Returns the results in input order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(input_path, output_path_for(input_path, output_dir, output_format)) for input_path in inputs]
+    size = max(1, min(GROUP_SIZE, -(-len(jobs) // (workers or os.cpu_count()))))
+    groups = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+    results = {}
+    # Spawned, not forked: a fork could inherit a model lock held by the warm-up thread, or a
+    # model session whose runtime threads do not exist in the child
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_convert_group_job, group, sr, use_cache, threads, backend, ordering, render)
+                   for group in groups]
+        for future in as_completed(futures):
+            for result in future.result():
+                results[result["input"]] = result
+                if on_result is not None:
+                    on_result(result)
+    return [results[input_path] for input_path in inputs]
+
+def summarize(results, wall_time, width=58):
+    """ Per-file timings and failures as a text table """
+    lines = [" Batch Conversion Summary ".center(width, '=')]
+    lines.append(f"{'File':<26}{'Events':>8}{'Transc.':>8}{'Total':>8}{'Status':>8}")
+    for r in results:
+        name = os.path.basename(r["input"])
+        name = name if len(name) <= 25 else name[:22] + '...'
+        status = "FAILED" if r["error"] else "ok"
+        transcription = r["timings"].get("transcription")
+        lines.append(f"{name:<26}{r['events']:>8}"
+                     f"{(f'{transcription:.1f}s' if transcription is not None else '--'):>8}"
+                     f"{r['total']:>7.1f}s{status:>8}")
+    failed = [r for r in results if r["error"]]
+    lines.append('-' * width)
+    lines.append(f"{len(results) - len(failed)} converted, {len(failed)} failed, "
+                 f"wall time {wall_time:.1f}s".center(width))
+    for r in failed:
+        lines.append(f"{os.path.basename(r['input'])}: {r['error']}"[:width])
+    return '\n'.join(lines)
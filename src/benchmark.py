@@ -0,0 +1,173 @@
+import gc
+import json
+import multiprocessing
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import ORDERING_CONTENDERS, contender_input
+from event_array import EVENT_DTYPE, EventArray
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+
+DISTRIBUTIONS = ("uniform", "runs", "sorted", "reversed", "clustered")
+
+def synthetic_events(n, distribution="uniform", duplicates=0.0, seed=0):
+    """
+    n synthetic events (about 20 per second of music) as an EventArray.
+    - uniform: timestamps uniformly spread, in random order
+    - runs: 4 sorted runs one after the other, like the per-instrument output of to_events
+    - sorted / reversed: already in (reverse) time order
+    - clustered: timestamps bunched around beats at 120 bpm
+    duplicates is the fraction of events that reuse the timestamp of another event.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution}'. Available choices: {', '.join(DISTRIBUTIONS)}")
+    if not 0 <= duplicates <= 1:
+        raise ValueError("The duplicate rate must be between 0 and 1.")
+
+    rng = np.random.default_rng(seed)
+    duration = n / 20
+    if distribution == "clustered":
+        beats = rng.integers(0, max(1, int(duration * 2)), n) * 0.5
+        times = beats + rng.normal(0, 0.01, n)
+    else:
+        times = rng.uniform(0, duration, n)
+
+    if duplicates and n > 1:
+        dup = rng.random(n) < duplicates
+        times[dup] = times[rng.integers(0, n, int(np.count_nonzero(dup)))]
+
+    if distribution == "sorted":
+        times.sort()
+    elif distribution == "reversed":
+        times[::-1].sort()
+    elif distribution == "runs":
+        runs = np.array_split(times, 4)
+        times = np.concatenate([np.sort(run) for run in runs])
+
+    data = np.empty(n, dtype=EVENT_DTYPE)
+    data["time"] = times
+    data["type"] = rng.integers(0, 2, n)
+    data["pitch"] = rng.integers(21, 109, n)
+    return EventArray(data)
+
+def _measure(contender, n, distribution, duplicates, seed, repeats, warmup, sr, instrumented):
+    """ Warm-up runs, then `repeats` timed runs with the garbage collector off; input setup is never timed """
+    form, order = ORDERING_CONTENDERS[contender]
+    events = synthetic_events(n, distribution, duplicates, seed)
+
+    for _ in range(warmup):
+        order(contender_input(form, events), sr, instrumented)
+
+    timings, counters = [], {}
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            work = contender_input(form, events)
+            gc.collect()
+            gc.disable()
+            t0 = time.perf_counter()
+            result, counters = order(work, sr, instrumented)
+            timings.append(time.perf_counter() - t0)
+            gc.enable()
+            del result, work
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings, counters
+
+def _stats(timings):
+    q1, median, q3 = np.percentile(timings, [25, 50, 75])
+    return {"median": float(median), "iqr": float(q3 - q1), "min": float(min(timings)),
+            "runs": [float(t) for t in timings]}
+
+def run_benchmark(sizes=DEFAULT_SIZES, contenders=None, distribution="uniform", duplicates=0.0, seed=0,
+                  repeats=5, warmup=1, budget=60.0, isolate=True, sr=44100, instrumented=False, on_result=None):
+    """
+    Time every contender on synthetic inputs of every size (tick-based contenders at sample rate sr).
+    With isolate, each (contender, size) runs in a fresh process, so allocations left over
+    from earlier runs do not skew later ones. A contender whose median exceeded `budget`
+    seconds at one size is skipped at the larger sizes.
+    The structures run without operation counters unless instrumented is set.
+    on_result is called with each result as soon as it is measured.
+    Returns a JSON-serializable report.
+    """
+    contenders = list(contenders or ORDERING_CONTENDERS)
+    for contender in contenders:
+        if contender not in ORDERING_CONTENDERS:
+            raise ValueError(f"Unknown contender '{contender}'. "
+                             f"Available choices: {', '.join(ORDERING_CONTENDERS)}")
+
+    results = []
+    over_budget = set()
+    for n in sorted(sizes):
+        for contender in contenders:
+            result = {"contender": contender, "size": n}
+            if contender in over_budget:
+                result["skipped"] = f"over the {budget:g}s budget at a smaller size"
+            else:
+                args = (contender, n, distribution, duplicates, seed, repeats, warmup, sr, instrumented)
+                if isolate:
+                    with ProcessPoolExecutor(max_workers=1,
+                                             mp_context=multiprocessing.get_context("spawn")) as executor:
+                        timings, counters = executor.submit(_measure, *args).result()
+                else:
+                    timings, counters = _measure(*args)
+                result.update(_stats(timings), counters=counters)
+                if result["median"] > budget:
+                    over_budget.add(contender)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return {
+        "params": dict(sizes=sorted(sizes), contenders=contenders, distribution=distribution,
+                       duplicates=duplicates, seed=seed, repeats=repeats, warmup=warmup,
+                       budget=budget, isolate=isolate, sr=sr, instrumented=instrumented),
+        "environment": dict(python=platform.python_version(), numpy=np.__version__,
+                            machine=platform.machine(), processor=platform.processor()),
+        "results": results,
+    }
+
+def write_json(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def growth_exponent(results, contender):
+    """ Slope of log(time) over log(size): ~1 for linear, a bit above 1 for n log n """
+    points = [(r["size"], r["median"]) for r in results
+              if r["contender"] == contender and r.get("median", 0) > 0]
+    if len(points) < 2:
+        return None
+    sizes, medians = np.log(np.array(points)).T
+    return float(np.polyfit(sizes, medians, 1)[0])
+
+def scaling_table(report, width=58):
+    """
+    Median ± IQR per size and contender, plus the fitted growth exponent. Columns share
+    width evenly, but widen (past width) rather than let cells run into each other.
+    """
+    contenders = report["params"]["contenders"]
+    by_key = {(r["contender"], r["size"]): r for r in report["results"]}
+
+    def cell(r):
+        if r is None or "median" not in r:
+            return "--"
+        median, iqr = r["median"], r["iqr"]
+        scale, unit = (1e3, "ms") if median < 1 else (1, "s")
+        return f"{median * scale:.3g}±{iqr * scale:.2g}{unit}"
+
+    rows = [[cell(by_key.get((c, n))) for c in contenders] for n in report["params"]["sizes"]]
+    exponents = [growth_exponent(report["results"], c) for c in contenders]
+    growth = [f'n^{e:.2f}' if e is not None else '--' for e in exponents]
+    widest = max((len(text) for row in rows + [growth] for text in row), default=0)
+    col = max(12, (width - 10) // max(1, len(contenders)), widest + 2)
+
+    lines = [f"{'Events':>10}" + ''.join(f"{c[:col - 1]:>{col}}" for c in contenders)]
+    for n, row in zip(report["params"]["sizes"], rows):
+        lines.append(f"{n:>10.0e}" + ''.join(f"{text:>{col}}" for text in row))
+    lines.append(f"{'Growth':>10}" + ''.join(f"{text:>{col}}" for text in growth))
+    return '\n'.join(lines)
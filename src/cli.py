@@ -1,9 +1,23 @@
+# Imported first so the startup report covers every import below
+from startup import mark, startup_report, warm_up_model
+
 import cmd
 import os
 import shlex
+import sys
+import time
 import soundfile as sf
 
 from core import *
+from event_array import EventArray
+from profiler import profiling
+from batch import collect_inputs, run_batch, summarize
+from benchmark import DEFAULT_SIZES, DISTRIBUTIONS, run_benchmark, scaling_table, write_json
+from transcription_cache import TranscriptionCache
+from voice_pool import VoicePool, parse_channels, parse_percussion, STEAL_POLICIES
+from watcher import watch
+
+mark("modules imported")
 
 """ ==================== Helper ==================== """
 def validate_input_file(filename):
@@ -30,6 +44,90 @@ def validate_input_file(filename):
 
     return None
 
+def split_options(args):
+    """ Splits '--key=value' options from positional arguments """
+    positional, options = [], {}
+    for arg in args:
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+        else:
+            positional.append(arg)
+    return positional, options
+
+def parse_output_args(args):
+    """
+    Validates the optional [output_format] [output_sample_rate] arguments shared by 'convert', 'batch'
+    and 'watch' and returns them with their defaults; raises ValueError with a message.
+    """
+    output_format = args[0].lower() if len(args) >= 1 else "wav"
+    output_sample_rate = args[1] if len(args) >= 2 else "44100"
+    if output_format not in ConverterCLI.VALID_FORMATS:
+        raise ValueError(f"'{output_format}' is not supported.\n"
+                         f"Available choices: {', '.join(ConverterCLI.VALID_FORMATS)}")
+    if output_sample_rate not in ConverterCLI.VALID_SAMPLE_RATE:
+        raise ValueError(f"'{output_sample_rate}' is not supported.\n"
+                         f"Available choices: {', '.join(ConverterCLI.VALID_SAMPLE_RATE)}")
+    return output_format, output_sample_rate
+
+def parse_render_options(options, output_format, output_sample_rate):
+    """
+    Validates the rendering options shared by 'convert', 'batch' and 'watch'.
+    Returns the write_8_bit keyword arguments plus 'threads'; raises ValueError with a message.
+    """
+    engine = options.get("engine", "vectorized")
+    if engine not in SYNTH_ENGINES:
+        raise ValueError(f"Engine '{engine}' is not supported.\n"
+                         f"Available choices: {', '.join(SYNTH_ENGINES)}")
+
+    pool = None
+    if "channels" in options:
+        percussion = parse_percussion(options["percussion"]) if "percussion" in options else ()
+        pool = VoicePool(parse_channels(options["channels"]), options.get("steal", "oldest"), percussion)
+        if engine not in OSCILLATORS:
+            raise ValueError(f"Engine '{engine}' does not support '--channels'.\n"
+                             f"Available choices: {', '.join(OSCILLATORS)}")
+
+    try:
+        internal_sr = int(options["internal-sr"]) if "internal-sr" in options else None
+        bit_depth = int(options["bit-depth"]) if "bit-depth" in options else None
+        threads = int(options["threads"]) if "threads" in options else None
+    except ValueError:
+        raise ValueError("'--internal-sr', '--bit-depth' and '--threads' must be integers.")
+    if threads is not None and threads < 1:
+        raise ValueError("'--threads' must be at least 1.")
+    if threads is not None and pool is not None:
+        raise ValueError("'--threads' cannot be combined with '--channels'.")
+    if internal_sr is not None and not 0 < internal_sr <= int(output_sample_rate):
+        raise ValueError(f"'--internal-sr' must be between 1 and the output sample rate ({output_sample_rate}).")
+    if bit_depth is not None and not 2 <= bit_depth <= 24:
+        raise ValueError("'--bit-depth' must be between 2 and 24.")
+
+    subtype = options.get("subtype", "").upper() or None
+    if subtype is not None and not sf.check_format(output_format.upper(), subtype):
+        supported = [s for s in ConverterCLI.VALID_SUBTYPES if sf.check_format(output_format.upper(), s)]
+        raise ValueError(f"Subtype '{subtype}' is not supported for '{output_format}'.\n"
+                         f"Available choices: {', '.join(supported) or 'none'}")
+
+    return dict(engine=engine, pool=pool, internal_sr=internal_sr, bit_depth=bit_depth,
+                subtype=subtype, threads=threads)
+
+def parse_backend_option(options):
+    """ Validates '--backend' and returns the transcription backend name; raises ValueError with a message """
+    backend = options.get("backend", "basic-pitch")
+    if backend not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Backend '{backend}' is not supported.\n"
+                         f"Available choices: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    return backend
+
+def parse_ordering_option(options):
+    """ Validates '--ordering' and returns 'auto' or an ORDERING_CONTENDERS name; raises ValueError with a message """
+    ordering = options.get("ordering", "auto")
+    if ordering != "auto" and ordering not in ORDERING_CONTENDERS:
+        raise ValueError(f"Ordering '{ordering}' is not supported.\n"
+                         f"Available choices: auto, {', '.join(ORDERING_CONTENDERS)}")
+    return ordering
+
 def bordered(text):
     """ Adds borders to text """
     lines = text.splitlines()
@@ -40,6 +138,32 @@ def bordered(text):
     res.append('└' + '─' * width + '┘')
     return '\n'.join(res)
 
+def print_ds_comparison(events, sr):
+    """ Runs ds_comparison on events and prints its report """
+    runtime, plain_runtime, num_of_operation = ds_comparison(events, sr)
+    print(bordered(" Data Structure Comparison ".center(58, '=') + '\n' +
+          f"Number of Audio Events: {len(events)}".center(58) + '\n' +
+          " list.sort() (Python built-in method) ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[0] * 1000:.2f} ms".center(58) + '\n' +
+          " Self-implemented Priority Queue (Min-Heap) ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[1] * 1000:.2f} ms ({runtime[1] * 1000:.2f} ms with counters)".center(58) + '\n' +
+          f"# comparisons: {num_of_operation[0]}".center(58) + '\n' +
+          f"# swaps: {num_of_operation[1]}".center(58) + '\n' +
+          " Self-implemented Red-Black Tree ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[2] * 1000:.2f} ms ({runtime[2] * 1000:.2f} ms with counters)".center(58) + '\n' +
+          f"# comparisons: {num_of_operation[2]}".center(58) + '\n' +
+          f"# rotations: {num_of_operation[3]}".center(58) + '\n' +
+          " Self-implemented 4-ary Min-Heap (hole-based) ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[3] * 1000:.2f} ms ({runtime[3] * 1000:.2f} ms with counters)".center(58) + '\n' +
+          f"# comparisons: {num_of_operation[4]}".center(58) + '\n' +
+          f"# moves: {num_of_operation[5]}".center(58) + '\n' +
+          " NumPy LSD Radix Sort (sample ticks) ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[4] * 1000:.2f} ms".center(58) + '\n' +
+          f"# passes: {num_of_operation[6]}".center(58) + '\n' +
+          " NumPy Timsort (sample ticks) ".center(58, '-') + '\n' +
+          f"Runtime: {plain_runtime[5] * 1000:.2f} ms".center(58) + '\n' +
+          f"# sorted runs in the input: {num_of_operation[7]}".center(58)))
+
 
 class ConverterCLI(cmd.Cmd):
     intro = (' 8-bit Converter '.center(60, '=') + '\n' +
@@ -49,21 +173,53 @@ class ConverterCLI(cmd.Cmd):
 
     VALID_FORMATS = ["wav", "mp3", "flac"]
     VALID_SAMPLE_RATE = ["44100", "22050", "48000"]
+    VALID_ENGINES = list(SYNTH_ENGINES)
+    VALID_BACKENDS = list(TRANSCRIPTION_BACKENDS)
+    VALID_SUBTYPES = ["PCM_U8", "PCM_S8", "PCM_16", "PCM_24", "FLOAT"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = TranscriptionCache()
 
     def do_convert(self, arg):
         """
-        Syntax: convert <input_path> [output_format] [output_sample_rate]
+        Syntax: convert <input_path> [output_format] [output_sample_rate] [--option=value ...]
 
         Converts an audio file to an 8-bit style audio.
         - input_path (Required): The file to convert. Use quotes if it has spaces.
         - output_format (Optional): The format of the output file. Defaults to 'wav'.
         - output_sample_rate (Optional): The sample rate of the output file. Defaults to 44100.
+
+        Options:
+        - --backend=<name>: Transcription backend. 'basic-pitch' (default) is the polyphonic neural model;
+          'yin' is a fast monophonic pitch tracker that follows the dominant melody.
+        - --engine=<name>: Synthesis engine (vectorized, wavetable, numba, segment). Defaults to 'vectorized'.
+          'segment' and 'numba' render the whole track in memory; the others stream to the output file.
+        - --channels=<layout>: Render on a fixed set of channels: 'nes' (2 pulse + triangle + noise),
+          a channel count, or a comma-separated list of pulse/triangle/noise. Unlimited by default.
+        - --steal=<policy>: Voice stealing when all channels are busy (oldest, lowest, quietest).
+          Defaults to 'oldest'.
+        - --percussion=<pitches>: MIDI pitches played on the noise channels, e.g. '35-51' or '36,38,42'.
+          Without it, noise channels stay silent and transcribed notes use the pulse/triangle channels.
+        - --internal-sr=<rate>: Synthesize at a lower internal rate (e.g. 8000), held up to the output rate.
+        - --bit-depth=<bits>: Quantize the rendition to <bits> (e.g. 8) before output.
+        - --subtype=<subtype>: Output encoding, e.g. PCM_U8 (wav) or PCM_S8 (flac) for true 8-bit PCM.
+        - --threads=<n>: Render on <n> threads: every transcribed instrument, split into pitch groups, then mix.
+        - --cache=off: Re-run transcription even if this file was transcribed before.
+        - --stream=on: Transcribe in windows and synthesize while later windows are still analysed.
+          Skips ordering and the cache; only for the basic-pitch backend and the vectorized/wavetable engines.
+        - --ordering=<name>: How events are put in time order: 'auto' (default) picks timsort for nearly
+          ordered events and the radix sort otherwise; or one of list.sort, min-heap, "red-black tree",
+          4-ary heap, radix sort, timsort.
+        - --compare=on: After writing the output, time every ordering strategy on the events and report.
+        - --profile=<path>: Also write the wall time, CPU time and peak memory of every stage to a JSON file.
+        - --trace=<path>: Also write the stages as a Chrome trace-event file, to inspect in a timeline viewer.
         """
-        args = shlex.split(arg)
+        args, options = split_options(shlex.split(arg))
 
         if len(args) < 1:
             print('Error: Missing required argument "input_path".')
-            print("Usage: convert <input_path> [output_format] [output_sample_rate]")
+            print("Usage: convert <input_path> [output_format] [output_sample_rate] [--option=value ...]")
             return
 
         input_path = validate_input_file(args[0])
@@ -75,48 +231,90 @@ class ConverterCLI(cmd.Cmd):
             print(f"Error: File '{args[0]}' not found in 'input/' or current directory.")
             return
 
-        output_format = args[1].lower() if len(args) >= 2 else "wav"
-
-        output_sample_rate = args[2] if len(args) >= 3 else "44100"
-
-        if output_format not in self.VALID_FORMATS:
-            print(f"Error: '{output_format}' is not supported.\n"
-                  f"Available choices: {', '.join(self.VALID_FORMATS)}")
+        try:
+            output_format, output_sample_rate = parse_output_args(args[1:])
+            render = parse_render_options(options, output_format, output_sample_rate)
+            backend = parse_backend_option(options)
+            ordering = parse_ordering_option(options)
+        except ValueError as e:
+            print(f"Error: {e}")
             return
-
-        if output_sample_rate not in self.VALID_SAMPLE_RATE:
-            print(f"Error: '{output_sample_rate}' is not supported.\n"
-                  f"Available choices: {', '.join(self.VALID_SAMPLE_RATE)}")
+        threads = render.pop("threads")
+        compare = options.get("compare") == "on"
+
+        stream = options.get("stream") == "on"
+        if stream and (render["engine"] not in OSCILLATORS or render["pool"] is not None or threads is not None
+                       or backend != "basic-pitch" or compare):
+            print("Error: '--stream=on' needs the basic-pitch backend and the vectorized or wavetable engine, "
+                  "without '--channels', '--threads' or '--compare'.")
             return
 
         print(f">>> Processing file: '{input_path}'\n")
 
-        events = to_events(input_path)
-        sorted_events, runtime, num_of_operation = ds_comparison(events)
-
-        print(bordered(" Data Structure Comparison ".center(58, '=') + '\n' +
-              f"Number of Audio Events: {len(sorted_events)}".center(58) + '\n' +
-              " list.sort() (Python built-in method) ".center(58, '-') + '\n' +
-              f"Runtime: {runtime[0] * 1000:.2f} ms".center(58) + '\n' +
-              " Self-implemented Priority Queue (Min-Heap) ".center(58, '-') + '\n' +
-              f"Runtime: {runtime[1] * 1000:.2f} ms".center(58) + '\n' +
-              f"# comparisons: {num_of_operation[0]}".center(58) + '\n' +
-              f"# swaps: {num_of_operation[1]}".center(58) + '\n' +
-              " Self-implemented Red-Black Tree ".center(58, '-') + '\n' +
-              f"Runtime: {runtime[2] * 1000:.2f} ms".center(58) + '\n' +
-              f"# comparisons: {num_of_operation[2]}".center(58) + '\n' +
-              f"# rotations: {num_of_operation[3]}".center(58)))
-
-        output_data = to_8_bit(sorted_events, int(output_sample_rate))
-        sf.write(f"{os.path.splitext(os.path.basename(input_path))[0]}_8bit.{output_format}", output_data, int(output_sample_rate))
-        print(f'>>> Converted "{input_path}" -> "{os.path.basename(input_path)}_8bit.{output_format}"\n')
+        output_path = f"{os.path.splitext(os.path.basename(input_path))[0]}_8bit.{output_format}"
+        with profiling(os.path.basename(input_path)) as profile:
+            self._convert_file(input_path, output_path, output_sample_rate, render, backend, ordering, threads, stream,
+                               compare, options)
+
+        print(bordered(" Stage Profile ".center(58, '=') + '\n' + profile.report(58)) + '\n')
+        if "profile" in options:
+            profile.write_json(options["profile"])
+            print(f'>>> Wrote "{options["profile"]}"')
+        if "trace" in options:
+            profile.write_trace(options["trace"])
+            print(f'>>> Wrote "{options["trace"]}" (open in chrome://tracing or ui.perfetto.dev)')
+
+    def _convert_file(self, input_path, output_path, output_sample_rate, render, backend, ordering, threads, stream,
+                      compare, options):
+        """ The conversion pipeline of do_convert, after its arguments are validated """
+        if stream:
+            render.pop("pool")
+            subtype = render.pop("subtype")
+            blocks = render_event_stream(stream_events(input_path), int(output_sample_rate), **render)
+            write_blocks(output_path, blocks, int(output_sample_rate), subtype=subtype)
+            print(f'>>> Converted "{input_path}" -> "{output_path}"\n')
+            return
 
+        cache = None if options.get("cache") == "off" else self.cache
+        channel_events = to_events(input_path, by_instrument=True, cache=cache, backend=backend)
+        # Events are ordered on the sample ticks of the rate they are synthesized at
+        render_sr = render["internal_sr"] or int(output_sample_rate)
+
+        if threads is not None:
+            ordered = [order_events(channel, render_sr, ordering) for channel in channel_events]
+            strategies = sorted({strategy for _, strategy in ordered})
+            print(f">>> Ordered {sum(len(channel) for channel, _ in ordered)} events by {', '.join(strategies)}\n")
+            output_data = to_8_bit_channels([channel for channel, _ in ordered], int(output_sample_rate),
+                                            engine=render["engine"], workers=threads,
+                                            internal_sr=render["internal_sr"], bit_depth=render["bit_depth"])
+            write_blocks(output_path, split_blocks(output_data), int(output_sample_rate), subtype=render["subtype"])
+        else:
+            sorted_events, strategy = order_events(EventArray.concatenate(channel_events), render_sr, ordering)
+            print(f">>> Ordered {len(sorted_events)} events by {strategy}\n")
+            write_8_bit(output_path, sorted_events, int(output_sample_rate), **render)
+        print(f'>>> Converted "{input_path}" -> "{output_path}"\n')
+
+        if compare:
+            # The output is complete; the comparison only reports
+            print_ds_comparison(EventArray.concatenate(channel_events), render_sr)
 
     def complete_convert(self, text, line, begidx, endidx):
         """
-        Provides tab completion for the output_format (2nd arg) and output_sample_rate (3rd arg).
+        Provides tab completion for the output_format (2nd arg), output_sample_rate (3rd arg) and option values.
         """
-        parts = shlex.split(line[:begidx])
+        # readline splits on '=', so option values arrive without their '--key=' prefix
+        if line[:begidx].endswith('--backend='):
+            return [b for b in self.VALID_BACKENDS if b.startswith(text)]
+        if line[:begidx].endswith('--engine='):
+            return [e for e in self.VALID_ENGINES if e.startswith(text)]
+        if line[:begidx].endswith('--steal='):
+            return [p for p in STEAL_POLICIES if p.startswith(text)]
+        if line[:begidx].endswith('--subtype='):
+            return [s for s in self.VALID_SUBTYPES if s.startswith(text.upper())]
+        if line[:begidx].endswith('--ordering='):
+            return [o for o in ["auto", *ORDERING_CONTENDERS] if ' ' not in o and o.startswith(text)]
+
+        parts, _ = split_options(shlex.split(line[:begidx]))
 
         current_arg_index = len(parts)
 
@@ -128,10 +326,238 @@ class ConverterCLI(cmd.Cmd):
 
         return []
 
+    def do_batch(self, arg):
+        """
+        Syntax: batch <directory|glob> [output_format] [output_sample_rate] [--option=value ...]
+
+        Converts every .wav/.mp3/.flac file in a directory (e.g. input/) or matching a glob
+        (e.g. "input/*.mp3") on a pool of worker processes, then prints a summary.
+        - output_format (Optional): The format of the output files. Defaults to 'wav'.
+        - output_sample_rate (Optional): The sample rate of the output files. Defaults to 44100.
+
+        Options:
+        - --workers=<n>: Number of worker processes. Defaults to the number of CPUs.
+        - --output-dir=<dir>: Where to write the outputs. Defaults to the current directory.
+        - All transcription, ordering and rendering options of 'convert' (--backend, --ordering, --engine, ...).
+        """
+        args, options = split_options(shlex.split(arg))
+
+        if len(args) < 1:
+            print('Error: Missing required argument "directory|glob".')
+            print("Usage: batch <directory|glob> [output_format] [output_sample_rate] [--option=value ...]")
+            return 1
+
+        inputs = collect_inputs(args[0])
+        if not inputs:
+            print(f"Error: No .wav/.mp3/.flac files found for '{args[0]}'.")
+            return 1
+
+        try:
+            output_format, output_sample_rate = parse_output_args(args[1:])
+            render = parse_render_options(options, output_format, output_sample_rate)
+            backend = parse_backend_option(options)
+            ordering = parse_ordering_option(options)
+            workers = int(options["workers"]) if "workers" in options else None
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        if workers is not None and workers < 1:
+            print("Error: '--workers' must be at least 1.")
+            return 1
+
+        output_dir = options.get("output-dir", os.getcwd())
+        print(f">>> Converting {len(inputs)} file(s) on {workers or os.cpu_count()} worker process(es)\n")
+
+        def report(result):
+            status = f"failed ({result['error']})" if result["error"] else f"{result['total']:.1f}s"
+            print(f'>>> "{os.path.basename(result["input"])}": {status}')
+
+        t0 = time.perf_counter()
+        results = run_batch(inputs, output_dir, output_format, int(output_sample_rate), workers=workers,
+                            use_cache=options.get("cache") != "off", backend=backend, ordering=ordering,
+                            on_result=report, **render)
+        print('\n' + bordered(summarize(results, time.perf_counter() - t0)) + '\n')
+        return 1 if any(result["error"] for result in results) else None
+
+    def do_watch(self, arg):
+        """
+        Syntax: watch [directory] [output_format] [output_sample_rate] [--option=value ...]
+
+        Runs until Ctrl+C, converting every .wav/.mp3/.flac file that appears or changes in a directory.
+        Files are picked up once they stop changing, and outputs only appear once complete.
+        Finished files are remembered in the output directory, so a restart does not convert them again.
+        - directory (Optional): The directory to watch. Defaults to 'input'.
+        - output_format (Optional): The format of the output files. Defaults to 'wav'.
+        - output_sample_rate (Optional): The sample rate of the output files. Defaults to 44100.
+
+        Options:
+        - --workers=<n>: Number of worker processes. Defaults to the number of CPUs.
+        - --queue=<n>: Files converting or waiting for a worker at a time. Defaults to twice the workers.
+        - --interval=<seconds>: How often the directory is scanned. Defaults to 1.
+        - --settle=<seconds>: How long a file must stay unchanged before it is converted. Defaults to 2.
+        - --output-dir=<dir>: Where to write the outputs. Defaults to the current directory.
+        - All transcription, ordering and rendering options of 'convert' (--backend, --ordering, --engine, ...).
+        """
+        args, options = split_options(shlex.split(arg))
+
+        input_dir = args[0] if len(args) >= 1 else os.path.join(os.getcwd(), 'input')
+        if not os.path.isdir(input_dir):
+            print(f"Error: Directory '{input_dir}' not found.")
+            return 1
+
+        try:
+            output_format, output_sample_rate = parse_output_args(args[1:])
+            render = parse_render_options(options, output_format, output_sample_rate)
+            backend = parse_backend_option(options)
+            ordering = parse_ordering_option(options)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        try:
+            workers = int(options["workers"]) if "workers" in options else None
+            max_pending = int(options["queue"]) if "queue" in options else None
+            interval = float(options.get("interval", 1))
+            settle = float(options.get("settle", 2))
+        except ValueError:
+            print("Error: '--workers', '--queue', '--interval' and '--settle' must be numbers.")
+            return 1
+        if (workers is not None and workers < 1) or (max_pending is not None and max_pending < 1):
+            print("Error: '--workers' and '--queue' must be at least 1.")
+            return 1
+        if interval <= 0 or settle < 0:
+            print("Error: '--interval' must be positive and '--settle' at least 0.")
+            return 1
+
+        output_dir = options.get("output-dir", os.getcwd())
+        print(f">>> Watching '{input_dir}' with {workers or os.cpu_count()} worker process(es). "
+              f"Press Ctrl+C to stop.\n")
+
+        counts = {"converted": 0, "failed": 0}
+
+        def queued(input_path):
+            print(f'>>> Queued "{os.path.basename(input_path)}"')
+
+        def report(result):
+            counts["failed" if result["error"] else "converted"] += 1
+            status = f"failed ({result['error']})" if result["error"] else f"{result['total']:.1f}s"
+            print(f'>>> "{os.path.basename(result["input"])}" -> "{result["output"]}": {status}')
+
+        watch(input_dir, output_dir, output_format, int(output_sample_rate), workers=workers,
+              max_pending=max_pending, interval=interval, settle=settle, use_cache=options.get("cache") != "off",
+              backend=backend, ordering=ordering, on_queued=queued, on_result=report, **render)
+        print(f"\n>>> Stopped watching: {counts['converted']} converted, {counts['failed']} failed.\n")
+        return 1 if counts["failed"] else None
+
+    def do_bench(self, arg):
+        """
+        Syntax: bench [--option=value ...]
+
+        Benchmarks the event ordering data structures on synthetic event streams of growing size
+        and prints median ± IQR runtimes with the fitted growth exponent of each structure.
+
+        Options:
+        - --sizes=<n,n,...>: Numbers of events, e.g. 1e3,1e4,1e5. Defaults to 1e3 ... 1e7.
+        - --distribution=<name>: Timestamp distribution (uniform, runs, sorted, reversed, clustered).
+          Defaults to 'uniform'.
+        - --duplicates=<rate>: Fraction of events sharing a timestamp with another event. Defaults to 0.
+        - --contenders=<name,...>: Structures to run. Defaults to all.
+        - --repeats=<n>: Timed runs per measurement. Defaults to 5.
+        - --warmup=<n>: Untimed runs before timing. Defaults to 1.
+        - --budget=<seconds>: Skip larger sizes once a median exceeds this. Defaults to 60.
+        - --isolate=off: Measure in this process instead of a fresh process per measurement.
+        - --counters=on: Count comparisons, swaps and rotations (timed with the counting overhead).
+        - --seed=<n>: Random seed of the synthetic events. Defaults to 0.
+        - --json=<path>: Also write every timing and counter to a JSON file.
+        """
+        args, options = split_options(shlex.split(arg))
+        if args:
+            print(f"Error: Unexpected argument '{args[0]}'. Usage: bench [--option=value ...]")
+            return 1
+
+        try:
+            sizes = ([int(float(s)) for s in options["sizes"].split(',')]
+                     if "sizes" in options else list(DEFAULT_SIZES))
+            contenders = options["contenders"].split(',') if "contenders" in options else None
+            repeats = int(options.get("repeats", 5))
+            warmup = int(options.get("warmup", 1))
+            budget = float(options.get("budget", 60))
+            duplicates = float(options.get("duplicates", 0))
+            seed = int(options.get("seed", 0))
+        except ValueError:
+            print("Error: '--sizes', '--repeats', '--warmup', '--budget', '--duplicates' and '--seed' must be numbers.")
+            return 1
+        if min(sizes) < 1 or repeats < 1 or warmup < 0:
+            print("Error: '--sizes' and '--repeats' must be at least 1, '--warmup' at least 0.")
+            return 1
+        distribution = options.get("distribution", "uniform")
+        if distribution not in DISTRIBUTIONS:
+            print(f"Error: Distribution '{distribution}' is not supported.\n"
+                  f"Available choices: {', '.join(DISTRIBUTIONS)}")
+            return 1
+
+        def report(result):
+            status = result.get("skipped") or f"median {result['median'] * 1000:.2f} ms"
+            print(f">>> {result['contender']} @ {result['size']:.0e} events: {status}")
+
+        try:
+            bench = run_benchmark(sizes, contenders, distribution, duplicates, seed, repeats, warmup, budget,
+                                  isolate=options.get("isolate") != "off",
+                                  instrumented=options.get("counters") == "on", on_result=report)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+
+        print('\n' + bordered(" Ordering Benchmark ".center(58, '=') + '\n' +
+              f"{distribution} timestamps, {duplicates:.0%} duplicates, "
+              f"{repeats} runs + {warmup} warm-up".center(58) + '\n' +
+              '-' * 58 + '\n' + scaling_table(bench)) + '\n')
+        if "json" in options:
+            write_json(bench, options["json"])
+            print(f'>>> Wrote "{options["json"]}"\n')
+
+    def do_cache(self, arg):
+        """
+        Syntax: cache [info|clear]
+
+        Shows the transcription cache location and size, or removes all cached transcriptions.
+        """
+        action = arg.strip() or "info"
+        if action == "clear":
+            self.cache.clear()
+            print(">>> Transcription cache cleared.\n")
+        elif action == "info":
+            entries = self.cache.entries()
+            print(bordered(" Transcription Cache ".center(58, '=') + '\n' +
+                  f"Location: {self.cache.directory}"[:58].center(58) + '\n' +
+                  f"Entries: {len(entries)}".center(58) + '\n' +
+                  f"Size: {sum(size for _, size, _ in entries) / 1024:.1f} KiB "
+                  f"(budget {self.cache.max_bytes / 1024 ** 2:.0f} MiB)".center(58) + '\n' +
+                  f"Hits / misses this session: {self.cache.hits} / {self.cache.misses}".center(58)))
+        else:
+            print(f"Error: Unknown action '{action}'. Usage: cache [info|clear]")
+
+    def do_startup(self, arg):
+        """
+        Syntax: startup
+
+        Shows how long the CLI took to start, when the transcription model finished
+        warming up in the background, and which modules were imported lazily and at what cost.
+        """
+        print(bordered(startup_report()))
+
+    def preloop(self):
+        """ Load the transcription model in the background while the prompt is already usable """
+        mark("prompt shown")
+        warm_up_model()
+
     def do_exit(self, arg):
         """Exit the converter."""
         return True
 
+    def postcmd(self, stop, line):
+        """ Only 'exit' ends the loop: batch, watch and bench return 1 when they fail, for the entry points """
+        return stop is True
+
     def emptyline(self):
         """ Ignore empty line """
         pass
@@ -141,6 +567,18 @@ class ConverterCLI(cmd.Cmd):
         print(f"Unknown command: {line}. Type 'help' for valid commands.")
 
 
+def run_batch_cli():
+    """ Non-interactive batch entry point: same arguments as the 'batch' command """
+    sys.exit(ConverterCLI().onecmd('batch ' + shlex.join(sys.argv[1:])))
+
+def run_watch_cli():
+    """ Watch-folder daemon entry point: same arguments as the 'watch' command """
+    sys.exit(ConverterCLI().onecmd('watch ' + shlex.join(sys.argv[1:])))
+
+def run_bench_cli():
+    """ Non-interactive benchmark entry point: same arguments as the 'bench' command """
+    sys.exit(ConverterCLI().onecmd('bench ' + shlex.join(sys.argv[1:])))
+
 def run_cli():
     """ CLI entry point """
     try:
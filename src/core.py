@@ -2,17 +2,26 @@
 import logging
 logging.basicConfig(level=logging.ERROR)
 import io
+import os
 from contextlib import redirect_stdout
 
-import copy
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import numpy as np
+import soundfile as sf
 
-from basic_pitch.inference import predict
-from basic_pitch import ICASSP_2022_MODEL_PATH
-
+from audio_io import BlockWriter, DecodedAudio
+from event_array import EventArray
+from event_dary_heap import EventDaryHeap
 from event_min_heap import EventMinHeap
 from event_red_black_tree import EventRBTree
+from inference import AUDIO_SAMPLE_RATE, get_session, load_audio, model_fingerprint
+from pitch_tracker import yin_notes
+from profiler import stage
+from synth_kernel import get_render_events
+from voice_pool import CHANNEL_GAINS, CHANNEL_WAVEFORMS
+from wavetable import MIDI_FREQS, wavetable_bank, phase_increment, render_wavetable
 
 def sec_to_minsec(sec):
     """ Format seconds to minute:second """
@@ -25,58 +34,269 @@ def to_mono(data):
         data = data.mean(axis=1)
     return data
 
-def to_events(input_path):
-    """ Convert audio data to events """
+def _transcribe_basic_pitch(audios, onset_threshold, frame_threshold, minimum_note_length):
+    """ Polyphonic transcription with the basic-pitch model, one event list per instrument """
     f = io.StringIO() # Silence basic-pitch logging
-    with redirect_stdout(f):
-        # predict returns a PrettyMIDI object containing transcribed MIDI data
-        _, midi_data, _ = predict(
-            input_path,
-            ICASSP_2022_MODEL_PATH
-        )
-
-    events = []
-    for inst in midi_data.instruments:
-        for note in inst.notes:
-            # Store as tuple: (Timestamp, Type, NoteNumber)
-            # Type 1 = Note ON, Type 0 = Note OFF
-            events.append((note.start, 1, note.pitch))
-            events.append((note.end, 0, note.pitch))
+    with redirect_stdout(f), stage("inference"):
+        # PrettyMIDI objects containing transcribed MIDI data
+        midis = get_session().transcribe(audios, onset_threshold, frame_threshold, minimum_note_length)
+    with stage("event extraction"):
+        return [_midi_to_channels(midi_data) for midi_data in midis]
+
+def _transcribe_yin(audios, onset_threshold, frame_threshold, minimum_note_length):
+    """ Dominant-melody transcription with the YIN pitch tracker, as a single instrument """
+    with stage("inference"):
+        notes = [yin_notes(audio, AUDIO_SAMPLE_RATE, minimum_note_length) for audio in audios]
+    with stage("event extraction"):
+        return [[EventArray.from_notes(*note_track)] for note_track in notes]
+
+# Transcription backend name -> function(model-rate audios, thresholds...) -> per-input channel EventArrays
+TRANSCRIPTION_BACKENDS = {
+    "basic-pitch": _transcribe_basic_pitch,
+    "yin": _transcribe_yin,
+}
+
+def _backend_params(backend, onset_threshold, frame_threshold, minimum_note_length):
+    """ Everything the events of a backend depend on, for the transcription cache key """
+    if backend == "basic-pitch":
+        return dict(model=model_fingerprint(), onset_threshold=onset_threshold,
+                    frame_threshold=frame_threshold, minimum_note_length=minimum_note_length)
+    return dict(backend=backend, minimum_note_length=minimum_note_length)
+
+def to_events(input_path, by_instrument=False, cache=None, backend="basic-pitch",
+              onset_threshold=0.5, frame_threshold=0.3, minimum_note_length=127.70):
+    """
+    Convert audio data to an EventArray of (timestamp, type, pitch) events.
+    With by_instrument, returns one EventArray per transcribed instrument instead of a single one.
+    With a TranscriptionCache, inference is skipped for inputs transcribed before with the same parameters.
+    input_path may also be a DecodedAudio, whose cached model-rate samples are used instead of decoding again.
+    backend is a TRANSCRIPTION_BACKENDS name: 'basic-pitch' (polyphonic model) or 'yin' (fast, monophonic).
+    """
+    return to_events_batch([input_path], by_instrument, cache, backend,
+                           onset_threshold, frame_threshold, minimum_note_length)[0]
 
-    return events
+def to_events_batch(input_paths, by_instrument=False, cache=None, backend="basic-pitch",
+                    onset_threshold=0.5, frame_threshold=0.3, minimum_note_length=127.70):
+    """ to_events for several inputs, sharing model batches between the ones not cached yet """
+    if backend not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{backend}'. "
+                         f"Available choices: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    params = _backend_params(backend, onset_threshold, frame_threshold, minimum_note_length)
 
-def ds_comparison(events):
-    """ Data structure comparisons """
-    copy1, copy2, copy3 = [copy.deepcopy(events) for _ in range(3)]
+    results = [None] * len(input_paths)
+    keys = [None] * len(input_paths)
+    if cache is not None:
+        with stage("cache lookup"):
+            for i, input_path in enumerate(input_paths):
+                path = input_path.path if isinstance(input_path, DecodedAudio) else input_path
+                keys[i] = cache.key(path, **params)
+                results[i] = cache.load(keys[i])
 
-    # Python built-in list sort, by Timestamp (item 0 in tuple)
-    t0 = time.perf_counter()
-    copy1.sort(key=lambda x: x[0])
-    t1 = time.perf_counter() - t0
+    pending = [i for i, channels in enumerate(results) if channels is None]
+    if pending:
+        with stage("decode"):
+            audios = [load_audio(input_paths[i]) for i in pending]
+        transcribed = TRANSCRIPTION_BACKENDS[backend](audios, onset_threshold, frame_threshold, minimum_note_length)
+        if cache is not None:
+            with stage("cache store"):
+                for i, channels in zip(pending, transcribed):
+                    cache.store(keys[i], channels)
+        for i, channels in zip(pending, transcribed):
+            results[i] = channels
 
-    # Self-implemented Min Heap
-    t0 = time.perf_counter()
+    if by_instrument:
+        return results
+    return [EventArray.concatenate(channels) for channels in results]
+
+def stream_events(input_path, chunk_windows=16,
+                  onset_threshold=0.5, frame_threshold=0.3, minimum_note_length=127.70):
+    """
+    Transcribe input_path a chunk of model windows at a time and yield time-ordered events
+    as soon as no later chunk can produce an earlier one, so downstream stages can start
+    on the beginning of a long input while the rest is still being analysed.
+    """
+    # Decoded here, but resampled block by block as the windows need it
+    with stage("decode"):
+        audio = input_path if isinstance(input_path, DecodedAudio) else DecodedAudio.from_file(input_path)
+    chunks = get_session().stream_notes(audio, chunk_windows, onset_threshold, frame_threshold,
+                                        minimum_note_length)
+
+    # Events wait in a min-heap until the watermark passes them
     heap = EventMinHeap()
-    heap.build(copy2)
+    f = io.StringIO() # Silence basic-pitch logging
+    while True:
+        with redirect_stdout(f), stage("inference"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        watermark, notes = chunk
+        for start, end, pitch in notes:
+            heap.push(start, 1, pitch)
+            heap.push(end, 0, pitch)
+        while not heap.empty() and heap.peek()[0] < watermark:
+            yield heap.pop()
+
+    while not heap.empty():
+        yield heap.pop()
+
+def _midi_to_channels(midi_data):
+    """ One EventArray per transcribed instrument """
+    channels = []
+    for inst in midi_data.instruments:
+        notes = np.array([(note.start, note.end, note.pitch) for note in inst.notes]).reshape(-1, 3)
+        channels.append(EventArray.from_notes(notes[:, 0], notes[:, 1], notes[:, 2].astype(np.int64)))
+    return channels
+
+def _order_list_sort(events, sr, instrumented=True):
+    """ Python built-in list sort, by Timestamp (item 0 in tuple) """
+    events.sort(key=lambda x: x[0])
+    return events, {}
+
+def _order_min_heap(events, sr, instrumented=True):
+    """ Self-implemented Min Heap """
+    heap = EventMinHeap(instrumented)
+    heap.build(events)
     heap_sorted_events = []
     while not heap.empty():
         heap_sorted_events.append(heap.pop())
-    t2 = time.perf_counter() - t0
+    return heap_sorted_events, {"comparisons": heap.key_comparisons, "swaps": heap.swaps}
 
-    # Self-implemented Red-Black Tree
-    t0 = time.perf_counter()
-    rbt = EventRBTree()
-    for timestamp, evt_type, note in copy3:
+def _order_rb_tree(events, sr, instrumented=True):
+    """ Self-implemented Red-Black Tree """
+    rbt = EventRBTree(instrumented)
+    for timestamp, evt_type, note in events:
         rbt.push(timestamp, evt_type, note)
     rbt_sorted_events = []
     while not rbt.empty():
         rbt_sorted_events.append(rbt.pop_next())
-    t3 = time.perf_counter() - t0
+    return rbt_sorted_events, {"comparisons": rbt.key_comparisons, "rotations": rbt.rotations}
+
+def _order_dary_heap(events, sr, instrumented=True, arity=4):
+    """ Self-implemented d-ary Min Heap with hole-based sifting """
+    heap = EventDaryHeap(arity, instrumented)
+    heap.build(events)
+    heap_sorted_events = []
+    while not heap.empty():
+        heap_sorted_events.append(heap.pop())
+    return heap_sorted_events, {"comparisons": heap.key_comparisons, "moves": heap.swaps}
+
+def _order_radix(events, sr, instrumented=True):
+    """ LSD radix sort of the packed (tick, type, pitch) keys at sample resolution """
+    order, passes = events.radix_argsort(sr)
+    return events[order], {"passes": passes}
+
+def _order_timsort(events, sr, instrumented=True):
+    """ NumPy timsort of the packed (tick, type, pitch) keys, merging the runs already in order """
+    return events[events.timsort_argsort(sr)], {"runs": events.runs(sr) if instrumented else 0}
+
+# Event ordering strategies, run one at a time by order_events and all together by ds_comparison and the benchmark:
+# name -> (input form, function(events in that form, may be consumed; sr; instrumented) -> (time-ordered events, operation counters))
+# The input form is 'tuples' (a list of event tuples) or 'array' (an EventArray).
+# With instrumented=False the structures are built without operation counters, and the counters are all zero
+ORDERING_CONTENDERS = {
+    "list.sort": ("tuples", _order_list_sort),
+    "min-heap": ("tuples", _order_min_heap),
+    "red-black tree": ("tuples", _order_rb_tree),
+    "4-ary heap": ("tuples", _order_dary_heap),
+    "radix sort": ("array", _order_radix),
+    "timsort": ("array", _order_timsort),
+}
+
+# Timsort beats the O(n) radix sort while the merge depth log2(runs) stays below about 6
+TIMSORT_MAX_RUNS = 64
+TIMSORT_MAX_EVENTS = 2048
 
-    return copy1, [t1, t2, t3], [heap.key_comparisons, heap.swaps, rbt.key_comparisons, rbt.rotations]
+def contender_input(form, events):
+    """ A fresh copy of an EventArray in a contender's input form """
+    return events.tolist() if form == "tuples" else EventArray(events.data.copy())
 
-def to_8_bit(events, sr):
-    """ Re-synthesize sorted events into 8-bit style audio """
+def choose_ordering(events, sr):
+    """
+    The ordering strategy for 'auto': timsort for short or nearly ordered events (e.g. the
+    monophonic yin output, which is in order already), the radix sort otherwise.
+    """
+    if len(events) <= TIMSORT_MAX_EVENTS or events.runs(sr) <= TIMSORT_MAX_RUNS:
+        return "timsort"
+    return "radix sort"
+
+def order_events(events, sr, strategy="auto"):
+    """
+    Time-ordered events from exactly one ORDERING_CONTENDERS strategy, uninstrumented,
+    or the one choose_ordering picks for 'auto'.
+    Returns an EventArray and the strategy name. The array strategies order on sample ticks at sr,
+    with Note OFF before Note ON; the tuple strategies on timestamps only.
+    """
+    if not isinstance(events, EventArray):
+        events = EventArray.from_tuples(events)
+    if strategy == "auto":
+        strategy = choose_ordering(events, sr)
+    if strategy not in ORDERING_CONTENDERS:
+        raise ValueError(f"Unknown ordering strategy '{strategy}'. "
+                         f"Available choices: auto, {', '.join(ORDERING_CONTENDERS)}")
+
+    form, order = ORDERING_CONTENDERS[strategy]
+    with stage("ordering"):
+        ordered, _ = order(events.tolist() if form == "tuples" else events, sr, False)
+        if form == "tuples":
+            ordered = EventArray.from_tuples(ordered)
+    return ordered, strategy
+
+def ds_comparison(events, sr=44100):
+    """
+    Data structure comparisons: an opt-in benchmark of every ordering strategy on the same events.
+    Every contender runs twice: instrumented, for the operation counters, and uninstrumented,
+    for the runtime without the cost of counting.
+    Returns the instrumented runtimes, the uninstrumented runtimes and the counters.
+    """
+    if not isinstance(events, EventArray):
+        events = EventArray.from_tuples(events)
+
+    runtimes, plain_runtimes, counters = [], [], []
+    with stage("data structure comparison"):
+        for form, order in ORDERING_CONTENDERS.values():
+            for instrumented, timings in ((True, runtimes), (False, plain_runtimes)):
+                # Input setup is not timed; tuples are immutable, so no deep copies are needed
+                work = contender_input(form, events)
+                t0 = time.perf_counter()
+                _, ops = order(work, sr, instrumented)
+                timings.append(time.perf_counter() - t0)
+                if instrumented:
+                    counters.extend(ops.values())
+
+    return runtimes, plain_runtimes, counters
+
+def event_ticks(events, sr):
+    """ Sample boundary of every event, never moving backwards in time """
+    if isinstance(events, EventArray):
+        return events.ticks(sr)
+    times = np.fromiter((evt[0] for evt in events), dtype=np.float64, count=len(events))
+    return np.maximum.accumulate((times * sr).astype(np.int64))
+
+def note_spans(events, sr):
+    """ Pair sorted events into note spans on integer sample boundaries """
+    ticks = event_ticks(events, sr)
+
+    starts, ends, pitches = [], [], []
+    active_voices = {}  # Maps Note_Number -> Start_Sample
+    for tick, (_, event_type, note_pitch) in zip(ticks.tolist(), events):
+        if event_type == 1:  # Note ON
+            if note_pitch not in active_voices:
+                active_voices[note_pitch] = tick
+        else:  # Note OFF
+            if note_pitch in active_voices:
+                start = active_voices.pop(note_pitch)
+                if tick > start:
+                    starts.append(start)
+                    ends.append(tick)
+                    pitches.append(note_pitch)
+
+    num_samples = int(ticks[-1]) if len(events) else 0
+    # Voices still sounding at the last event produce no samples, as in the segment engine
+    return (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+            np.array(pitches, dtype=np.int64), num_samples)
+
+def _render_segments(events, sr):
+    """ Segment-by-segment synthesis: one chunk per gap between events """
     dt = 1.0 / sr
 
     audio_buffer = []
@@ -118,11 +338,381 @@ def to_8_bit(events, sr):
             if note_pitch in active_voices:
                 del active_voices[note_pitch]
 
-    full_audio = np.concatenate(audio_buffer)
+    if not audio_buffer:
+        return np.zeros(0)
+    return np.concatenate(audio_buffer)
+
+def _square_span(pitch, offset, num_samples, sr):
+    """ Naive square wave for samples [offset, offset + num_samples) of a note """
+    # Phase accumulator starting at 0 on Note ON, continuous until Note OFF
+    inc = MIDI_FREQS[pitch] / sr
+    phase = np.arange(offset, offset + num_samples) * inc
+    phase -= np.floor(phase)
+    # 8-Bit Square Wave, volume scaled to 0.5
+    return np.where(phase < 0.5, 0.5, -0.5)
+
+def _wavetable_span(pitch, offset, num_samples, sr):
+    """ Band-limited square wave for samples [offset, offset + num_samples) of a note """
+    inc = phase_increment(MIDI_FREQS[pitch], sr)
+    phase = (int(inc) * offset) % 2 ** 32
+    wave = render_wavetable(wavetable_bank(sr)[pitch], num_samples, inc, phase)
+    wave *= 0.5  # Volume scaling
+    return wave
+
+def _square_peak(pitches, sr):
+    return 0.5
+
+def _wavetable_peak(pitches, sr):
+    # Band-limited tables overshoot +-1 (Gibbs phenomenon)
+    return 0.5 * float(np.abs(wavetable_bank(sr)[np.unique(pitches)]).max()) if len(pitches) else 0.5
+
+# Span oscillators: name -> (render(pitch, offset, num_samples, sr), peak(pitches, sr))
+OSCILLATORS = {
+    "vectorized": (_square_span, _square_peak),
+    "wavetable": (_wavetable_span, _wavetable_peak),
+}
+
+def max_polyphony(starts, ends):
+    """ Largest number of note spans sounding at the same sample """
+    if not len(starts):
+        return 0
+    positions = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(len(starts), dtype=np.int64), -np.ones(len(ends), dtype=np.int64)])
+    # Spans are half-open, so a note ending at a sample is released before one starting there
+    order = np.lexsort((deltas, positions))
+    return int(np.cumsum(deltas[order]).max())
+
+def _span_layout(events, sr, oscillator, pool=None):
+    """
+    Note spans, the channel each one plays on, the waveform of every channel
+    and an upper bound of the mix's peak level.
+    """
+    render, peak = OSCILLATORS[oscillator]
+    if pool is None:
+        # Unbounded voices, all rendered with the engine's oscillator
+        starts, ends, pitches, num_samples = note_spans(events, sr)
+        slots = np.zeros(len(starts), dtype=np.int64)
+        waveforms = [render]
+        bound = max_polyphony(starts, ends) * peak(pitches, sr)
+    else:
+        ticks = event_ticks(events, sr)
+        starts, ends, pitches, slots = pool.allocate(ticks, events)
+        num_samples = int(ticks[-1]) if len(events) else 0
+        # Pulse channels use the engine's oscillator, the others their own waveform
+        waveforms = [render if kind == "pulse" else CHANNEL_WAVEFORMS[kind] for kind in pool.channels]
+        # Each channel sounds at most one voice at a time
+        bound = sum(peak(pitches[slots == i], sr) if kind == "pulse" else CHANNEL_GAINS[kind]
+                    for i, kind in enumerate(pool.channels))
+    return starts, ends, pitches, slots, waveforms, bound, num_samples
+
+def _render_timeline(events, sr, oscillator, pool=None):
+    """ Whole-timeline synthesis: one preallocated buffer, one vectorized span per note """
+    starts, ends, pitches, slots, waveforms, _, num_samples = _span_layout(events, sr, oscillator, pool)
+    full_audio = np.zeros(num_samples)
+
+    for start, end, pitch, slot in zip(starts.tolist(), ends.tolist(), pitches.tolist(), slots.tolist()):
+        full_audio[start:end] += waveforms[slot](pitch, 0, end - start, sr)
 
-    # Normalize to prevent distortion
-    max_val = np.max(np.abs(full_audio))
+    return full_audio
+
+def _render_numba(events, sr):
+    """ JIT-compiled synthesis kernel, falling back to the vectorized engine without numba """
+    kernel = get_render_events()
+    if kernel is None:
+        return _render_timeline(events, sr, oscillator="vectorized")
+
+    if not isinstance(events, EventArray):
+        events = EventArray.from_tuples(events)
+    ticks = event_ticks(events, sr)
+    types = np.ascontiguousarray(events.type)
+    pitches = events.pitch.astype(np.int64)
+
+    num_samples = int(ticks[-1]) if len(events) else 0
+    return kernel(ticks, types, pitches, MIDI_FREQS, float(sr), np.zeros(num_samples))
+
+# Synthesis engines selectable in to_8_bit, all returning un-normalized audio.
+# Engines also listed in OSCILLATORS support voice pools and block rendering.
+SYNTH_ENGINES = {
+    "segment": _render_segments,
+    "vectorized": partial(_render_timeline, oscillator="vectorized"),
+    "wavetable": partial(_render_timeline, oscillator="wavetable"),
+    "numba": _render_numba,
+}
+
+def normalize(audio):
+    """ Normalize audio in place to prevent distortion """
+    max_val = np.max(np.abs(audio)) if len(audio) else 0
     if max_val > 0:
-        full_audio = full_audio / max_val
+        audio /= max_val
+    return audio
 
+def quantize(audio, bit_depth):
+    """ Quantize normalized audio in place to the signed levels of a bit_depth DAC """
+    levels = 2 ** (bit_depth - 1) - 1
+    audio *= levels
+    np.round(audio, out=audio)
+    audio /= levels
+    return audio
+
+def zero_order_hold(audio, src_sr, dst_sr, offset=0):
+    """
+    Upsample by holding each sample until the next one.
+    offset is the index of audio[0] in the whole signal, so consecutive blocks line up.
+    """
+    first = -(-offset * dst_sr // src_sr)
+    last = -(-(offset + len(audio)) * dst_sr // src_sr)
+    return audio[np.arange(first, last) * src_sr // dst_sr - offset]
+
+def _check_engine(engine, pool=None):
+    if engine not in SYNTH_ENGINES:
+        raise ValueError(f"Unknown synthesis engine '{engine}'. "
+                         f"Available choices: {', '.join(SYNTH_ENGINES)}")
+    if pool is not None and engine not in OSCILLATORS:
+        raise ValueError(f"Engine '{engine}' does not support voice pools. "
+                         f"Available choices: {', '.join(OSCILLATORS)}")
+
+def to_8_bit(events, sr, engine="vectorized", pool=None, internal_sr=None, bit_depth=None):
+    """
+    Re-synthesize sorted events into 8-bit style audio, optionally on a fixed VoicePool.
+    With internal_sr/bit_depth, synthesis runs at a low rate and resolution like period
+    hardware, and is brought up to sr with a zero-order hold.
+    """
+    _check_engine(engine, pool)
+    render_sr = internal_sr or sr
+
+    with stage("synthesis"):
+        if pool is None:
+            full_audio = SYNTH_ENGINES[engine](events, render_sr)
+        else:
+            full_audio = _render_timeline(events, render_sr, engine, pool)
+    return _output_stage(full_audio, render_sr, sr, bit_depth)
+
+def _output_stage(full_audio, render_sr, sr, bit_depth):
+    """ Normalize, quantize and bring the rendition up to the output rate """
+    with stage("normalization"):
+        normalize(full_audio)
+        if bit_depth:
+            quantize(full_audio, bit_depth)
+        if render_sr != sr:
+            full_audio = zero_order_hold(full_audio, render_sr, sr)
     return full_audio
+
+# Engines whose voices render independently of each other, so a channel can be split by pitch
+PITCH_SPLITTABLE_ENGINES = ("vectorized", "wavetable", "numba")
+
+def pitch_groups(events, groups):
+    """
+    Split sorted events into at most `groups` EventArrays with disjoint pitches and similar
+    event counts (largest pitch first, each to the lightest group), every one still sorted.
+    Each group closes with a Note OFF at the last event's time, so a voice still sounding
+    there stops where it would in the whole timeline.
+    """
+    if not isinstance(events, EventArray):
+        events = EventArray.from_tuples(events)
+    counts = np.bincount(events.pitch, minlength=128)
+    group_of = np.zeros(128, dtype=np.int64)
+    loads = [0] * groups
+    for pitch in np.argsort(counts, kind='stable')[::-1]:
+        if counts[pitch] == 0:
+            break
+        group = loads.index(min(loads))
+        group_of[pitch] = group
+        loads[group] += counts[pitch]
+    membership = group_of[events.pitch]
+    parts = []
+    for group in range(groups):
+        if loads[group]:
+            part = events[membership == group]
+            end = EventArray.from_tuples([(events[-1][0], 0, part[-1][2])])
+            parts.append(EventArray.concatenate([part, end]))
+    return parts
+
+def to_8_bit_channels(channel_events, sr, engine="vectorized", workers=None, internal_sr=None, bit_depth=None):
+    """
+    Render the sorted events of every channel concurrently on a thread pool, then mix and normalize.
+    The heavy NumPy (and nogil numba) work releases the GIL, so the parts render in parallel.
+
+    Transcription usually yields a single channel, so with the engines whose voices are
+    independent each channel is further split into pitch groups (one per worker), which
+    mix back to exactly the same rendition.
+    """
+    _check_engine(engine)
+    render_sr = internal_sr or sr
+    workers = workers or os.cpu_count()
+
+    parts = channel_events
+    if engine in PITCH_SPLITTABLE_ENGINES and workers > 1:
+        parts = [group for events in channel_events for group in pitch_groups(events, workers)]
+
+    with stage("synthesis"), ThreadPoolExecutor(max_workers=workers) as executor:
+        buffers = list(executor.map(lambda events: SYNTH_ENGINES[engine](events, render_sr), parts))
+
+    with stage("mix"):
+        full_audio = np.zeros(max((len(b) for b in buffers), default=0))
+        for buffer in buffers:
+            full_audio[:len(buffer)] += buffer
+    return _output_stage(full_audio, render_sr, sr, bit_depth)
+
+def _span_blocks(events, sr, engine, block_size, pool):
+    """ Normalized float64 blocks rendered span by span """
+    starts, ends, pitches, slots, waveforms, bound, num_samples = _span_layout(events, sr, engine, pool)
+    gain = 1.0 / bound if bound > 0 else 1.0
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends, pitches, slots = (a[order].tolist() for a in (starts, ends, pitches, slots))
+
+    active = []  # Indices of spans overlapping the current block
+    next_span = 0
+    for block_start in range(0, num_samples, block_size):
+        block_end = min(block_start + block_size, num_samples)
+        block = np.zeros(block_end - block_start)
+
+        while next_span < len(starts) and starts[next_span] < block_end:
+            active.append(next_span)
+            next_span += 1
+
+        for i in active:
+            lo = max(starts[i], block_start)
+            hi = min(ends[i], block_end)
+            block[lo - block_start:hi - block_start] += waveforms[slots[i]](pitches[i], lo - starts[i], hi - lo, sr)
+        active = [i for i in active if ends[i] > block_end]
+
+        block *= gain
+        yield block
+
+def render_blocks(events, sr, engine="vectorized", block_size=65536, pool=None, internal_sr=None, bit_depth=None):
+    """
+    Yield the normalized rendition as float32 blocks.
+
+    Instead of a second pass for the peak, the gain comes from the worst case of the
+    whole timeline: maximum polyphony times the per-voice peak, or the summed channel
+    peaks with a voice pool. With every voice starting at phase 0 this is the exact
+    peak whenever the busiest chord starts together.
+
+    block_size counts samples at the render rate (internal_sr if given), so blocks come
+    out larger by sr / internal_sr after the zero-order hold.
+    """
+    if engine not in OSCILLATORS:
+        raise ValueError(f"Engine '{engine}' does not support block rendering. "
+                         f"Available choices: {', '.join(OSCILLATORS)}")
+    render_sr = internal_sr or sr
+    return _output_blocks(_span_blocks(events, render_sr, engine, block_size, pool), render_sr, sr, bit_depth)
+
+def _output_blocks(blocks, render_sr, sr, bit_depth):
+    """ Block-wise output stage: quantize, hold up to the output rate, convert to float32 """
+    offset = 0
+    for block in blocks:
+        if bit_depth:
+            quantize(block, bit_depth)
+        if render_sr != sr:
+            held = zero_order_hold(block, render_sr, sr, offset)
+            offset += len(block)
+            block = held
+        yield block.astype(np.float32)
+
+def _stream_blocks(events, sr, engine, block_size, max_voices):
+    """ Float64 blocks rendered from time-ordered events as they arrive """
+    render, peak = OSCILLATORS[engine]
+    gain = 1.0 / (max_voices * peak(np.arange(128), sr))
+
+    spans = []  # [start, end or None while sounding, pitch]
+    active_voices = {}  # Maps Note_Number -> span
+    written = 0
+    tick = 0
+
+    def flush(until):
+        nonlocal written, spans
+        while written < until:
+            block_end = min(written + block_size, until)
+            block = np.zeros(block_end - written)
+            for start, end, pitch in spans:
+                hi = block_end if end is None else min(end, block_end)
+                if hi > written:
+                    lo = max(start, written)
+                    block[lo - written:hi - written] += render(pitch, lo - start, hi - lo, sr)
+            spans = [span for span in spans if span[1] is None or span[1] > block_end]
+            written = block_end
+            block *= gain
+            np.clip(block, -1.0, 1.0, out=block)
+            yield block
+
+    for timestamp, event_type, note_pitch in events:
+        tick = max(tick, int(timestamp * sr))
+        if tick - written >= block_size:
+            yield from flush(tick)
+
+        if event_type == 1:  # Note ON
+            if note_pitch not in active_voices:
+                active_voices[note_pitch] = [tick, None, note_pitch]
+                spans.append(active_voices[note_pitch])
+        else:  # Note OFF
+            if note_pitch in active_voices:
+                active_voices.pop(note_pitch)[1] = tick
+
+    # Voices still sounding at the last event produce no samples, as in note_spans
+    for span in active_voices.values():
+        span[1] = tick
+    yield from flush(tick)
+
+def render_event_stream(events, sr, engine="vectorized", block_size=65536, max_voices=8,
+                        internal_sr=None, bit_depth=None):
+    """
+    Render an iterator of time-ordered events (e.g. stream_events) into float32 blocks
+    while the events are still being produced. The final peak is unknown while streaming,
+    so the gain assumes at most max_voices simultaneous voices and louder passages clip.
+    """
+    if engine not in OSCILLATORS:
+        raise ValueError(f"Engine '{engine}' does not support block rendering. "
+                         f"Available choices: {', '.join(OSCILLATORS)}")
+    render_sr = internal_sr or sr
+    return _output_blocks(_stream_blocks(events, render_sr, engine, block_size, max_voices),
+                          render_sr, sr, bit_depth)
+
+def write_8_bit(output_path, events, sr, engine="vectorized", block_size=65536, on_block=None, pool=None,
+                internal_sr=None, bit_depth=None, subtype=None):
+    """
+    Render sorted events block by block straight into an audio file.
+    subtype is a soundfile subtype, e.g. 'PCM_U8' (WAV) or 'PCM_S8' (FLAC) for true 8-bit PCM.
+    """
+    _check_engine(engine, pool)
+
+    if engine in OSCILLATORS:
+        blocks = render_blocks(events, sr, engine=engine, block_size=block_size, pool=pool,
+                               internal_sr=internal_sr, bit_depth=bit_depth)
+    else:
+        # Engines without block support render the whole timeline first
+        audio = to_8_bit(events, sr, engine=engine, internal_sr=internal_sr, bit_depth=bit_depth)
+        blocks = split_blocks(audio, block_size)
+
+    write_blocks(output_path, blocks, sr, subtype=subtype, on_block=on_block)
+
+def split_blocks(audio, block_size=65536):
+    """ Views of an in-memory rendition in blocks of block_size samples """
+    return (audio[i:i + block_size] for i in range(0, len(audio), block_size))
+
+def write_blocks(output_path, blocks, sr, subtype=None, on_block=None, background=True, max_blocks=4):
+    """
+    Write audio blocks incrementally through a single SoundFile handle.
+    With background=True a BlockWriter encodes on its own thread, at most max_blocks behind
+    rendering, so the wall time approaches the slower of the two instead of their sum;
+    on_block still runs on the calling thread. When profiling, producing the blocks counts
+    as block rendering and writing them as file write.
+    """
+    blocks = iter(blocks)
+    if background:
+        writer = BlockWriter(output_path, sr, subtype=subtype, max_blocks=max_blocks)
+        write = writer.put
+    else:
+        writer = sf.SoundFile(output_path, 'w', samplerate=sr, channels=1, subtype=subtype)
+        def write(block):
+            with stage("file write"):
+                writer.write(block)
+    with writer:
+        while True:
+            with stage("block rendering"):
+                block = next(blocks, None)
+            if block is None:
+                break
+            write(block)
+            if on_block is not None:
+                on_block(block)
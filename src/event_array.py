@@ -0,0 +1,161 @@
+import numpy as np
+
+# One row per event: 8 + 1 + 1 = 10 bytes (a (float, int, int) tuple costs over 100)
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("type", "u1"), ("pitch", "u1")])
+
+def radix_argsort(keys, digit_bits=16):
+    """
+    Stable LSD radix sort of non-negative integer keys, least significant 16-bit digit first.
+    Every pass is a counting sort: NumPy's stable sort of 16-bit integers is a radix sort, so
+    the whole sort is O(n * passes). Returns (order, number of passes).
+    """
+    if not len(keys):
+        return np.arange(0), 0
+    passes = max(1, -(-int(keys.max()).bit_length() // digit_bits))
+    mask = (1 << digit_bits) - 1
+    order = np.argsort((keys & mask).astype(np.uint16), kind='stable')
+    for p in range(1, passes):
+        digits = ((keys[order] >> (p * digit_bits)) & mask).astype(np.uint16)
+        order = order[np.argsort(digits, kind='stable')]
+    return order, passes
+
+
+class EventArray:
+    """
+    Columnar container of (timestamp, type, pitch) events backed by a NumPy structured array.
+    Type 1 = Note ON, Type 0 = Note OFF, as in the tuple events.
+
+    Iterating or indexing with an integer yields plain tuples, so EventMinHeap, EventRBTree,
+    VoicePool and the synthesis engines consume it like a list of events; slicing returns a
+    view without copying.
+
+    Timestamps are quantized to integer sample ticks once per sample rate; the ticks
+    follow the events through slicing and sorting.
+    """
+    __slots__ = ("data", "_ticks")
+
+    def __init__(self, data=None, ticks=None):
+        self.data = np.zeros(0, dtype=EVENT_DTYPE) if data is None else data
+        self._ticks = ticks  # (sr, int64 tick per event) or None
+
+    @classmethod
+    def from_notes(cls, starts, ends, pitches):
+        """ Note ON at every start and Note OFF at every end; notes that do not last are dropped """
+        starts, ends, pitches = np.asarray(starts), np.asarray(ends), np.asarray(pitches)
+        keep = ends > starts
+        n = int(np.count_nonzero(keep))
+        data = np.empty(2 * n, dtype=EVENT_DTYPE)
+        # Interleaved per note, in the same order as the tuple lists
+        data["time"][0::2], data["time"][1::2] = starts[keep], ends[keep]
+        data["type"][0::2], data["type"][1::2] = 1, 0
+        data["pitch"][0::2] = data["pitch"][1::2] = pitches[keep]
+        return cls(data)
+
+    @classmethod
+    def from_tuples(cls, events):
+        return cls(np.array(list(events), dtype=EVENT_DTYPE))
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """ One EventArray holding the events of all arrays (e.g. every instrument) """
+        arrays = [a.data for a in arrays]
+        return cls(np.concatenate(arrays) if arrays else None)
+
+    # ========== columns ==========
+    @property
+    def time(self):
+        return self.data["time"]
+
+    @property
+    def type(self):
+        return self.data["type"]
+
+    @property
+    def pitch(self):
+        return self.data["pitch"]
+
+    def quantize(self, sr):
+        """ Integer sample tick of every event at sr (truncated, like the segment engine) """
+        if self._ticks is None or self._ticks[0] != sr:
+            self._ticks = (sr, (self.data["time"] * sr).astype(np.int64))
+        return self._ticks[1]
+
+    def ticks(self, sr):
+        """ Sample boundary of every event, never moving backwards in time """
+        return np.maximum.accumulate(self.quantize(sr))
+
+    def sort_keys(self, sr):
+        """
+        Packed (tick, rank, pitch) keys: time order, then Note OFF before Note ON, then pitch.
+
+        Where a note starts and ends within one tick, Note OFF first would leave it stuck on.
+        So in a (tick, pitch) holding both, a Note OFF later than every Note ON ranks after
+        the Note ONs: the voice ends the tick as it would in timestamp order.
+        """
+        ticks = np.maximum(self.quantize(sr), 0)
+        time, kind, pitch = self.data["time"], self.data["type"], self.data["pitch"]
+        rank = kind.astype(np.int64)
+        is_on = kind == 1
+
+        # A hashed bitmap of the Note ONs' (tick, pitch) finds, in O(n), the few Note OFFs that may share one
+        size = 1 << max(10, (4 * len(ticks)).bit_length())
+        bucket = (ticks + pitch * np.int64(0x9E3779B1)) & (size - 1)  # Spreads the few pitches in use
+        bits = np.zeros(size, dtype=bool)
+        bits[bucket[is_on]] = True
+        shared = ~is_on & bits[bucket]
+        if shared.any():
+            bits[:] = False
+            bits[bucket[shared]] = True
+            members = np.flatnonzero(bits[bucket])
+            groups, slot = np.unique((ticks[members] << 7) | pitch[members], return_inverse=True)
+            member_on = is_on[members]
+            latest_on = np.full(len(groups), -np.inf)
+            np.maximum.at(latest_on, slot[member_on], time[members][member_on])
+            rank[members[~member_on & (time[members] > latest_on[slot])]] = 2  # -inf: no Note ON there
+        return (ticks << 10) | (rank << 8) | pitch
+
+    # ========== sequence protocol ==========
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data.tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.data[index].item()
+        ticks = None if self._ticks is None else (self._ticks[0], self._ticks[1][index])
+        return EventArray(self.data[index], ticks)
+
+    def tolist(self):
+        """ Events as a list of (timestamp, type, pitch) tuples """
+        return self.data.tolist()
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    # ========== ordering ==========
+    def argsort(self):
+        """ Time order; at equal times Note OFF comes before Note ON, so repeated notes retrigger """
+        return np.lexsort((self.data["type"], self.data["time"]))
+
+    def sorted(self):
+        return self[self.argsort()]
+
+    def radix_argsort(self, sr):
+        """ O(n) order on sample ticks at sr, via radix_argsort of the packed keys; returns (order, passes) """
+        return radix_argsort(self.sort_keys(sr))
+
+    def radix_sorted(self, sr):
+        """ Time order at sample resolution, with the deterministic tie-break of sort_keys """
+        return self[self.radix_argsort(sr)[0]]
+
+    def timsort_argsort(self, sr):
+        """ The order of radix_argsort by NumPy's stable timsort of the packed keys: linear on ordered input """
+        return np.argsort(self.sort_keys(sr), kind='stable')
+
+    def runs(self, sr):
+        """ Number of ascending runs of the packed keys: 1 when already in order, up to len(self) """
+        keys = self.sort_keys(sr)
+        return int(np.count_nonzero(keys[1:] < keys[:-1])) + 1 if len(keys) else 0
@@ -0,0 +1,160 @@
+class EventDaryHeap:
+    """
+    Min-heap of (timestamp, type, note) events with configurable arity.
+
+    Sifting moves a hole instead of swapping pairs: each displaced event is written once,
+    and the sifted event only at its final slot. Pops and build use the bottom-up
+    (Floyd/Wegener) sift-down, which walks the hole to a leaf along the smallest children
+    and then sifts the event back up, saving most comparisons against the sifted event.
+
+    Counters match EventMinHeap: key_comparisons counts timestamp comparisons, and swaps
+    counts element moves (a hole move writes one element where a swap writes two).
+    With instrumented=False the counters stay at zero and cost nothing.
+    """
+    instrumented = True
+
+    def __new__(cls, arity=4, instrumented=True):
+        if not instrumented:
+            cls = _PlainEventDaryHeap
+        return super().__new__(cls)
+
+    def __init__(self, arity=4, instrumented=True):
+        if arity < 2:
+            raise ValueError("Heap arity must be at least 2.")
+        self.arity = arity
+        self._heap = []
+
+        # counters
+        self.key_comparisons = 0
+        self.swaps = 0
+        self.pushes = 0
+        self.pops = 0
+
+    # ========== sifting ==========
+    def _sift_up(self, idx, item, top=0):
+        """ Move the hole at idx up (no higher than top) until item fits, then place item """
+        heap, d = self._heap, self.arity
+        key = item[0]
+        comparisons = moves = 0
+        while idx > top:
+            parent = (idx - 1) // d
+            comparisons += 1
+            if key < heap[parent][0]:
+                heap[idx] = heap[parent]
+                moves += 1
+                idx = parent
+            else:
+                break
+        heap[idx] = item
+        self.key_comparisons += comparisons
+        self.swaps += moves
+
+    def _sift_down(self, idx, item):
+        """ Bottom-up sift-down of item from the hole at idx """
+        heap, d = self._heap, self.arity
+        n = len(heap)
+        top = idx
+        comparisons = moves = 0
+        while True:
+            first = d * idx + 1
+            if first >= n:
+                break
+            smallest, smallest_key = first, heap[first][0]
+            for child in range(first + 1, min(first + d, n)):
+                comparisons += 1
+                key = heap[child][0]
+                if key < smallest_key:
+                    smallest, smallest_key = child, key
+            heap[idx] = heap[smallest]
+            moves += 1
+            idx = smallest
+        self.key_comparisons += comparisons
+        self.swaps += moves
+        self._sift_up(idx, item, top)
+
+    # ========== public methods ==========
+    def __len__(self):
+        return len(self._heap)
+
+    def build(self, events):
+        """ Floyd's heap construction: sift down every internal node, last to first """
+        self._heap = [(timestamp, evt_type, note) for (timestamp, evt_type, note) in events]
+        for i in range((len(self._heap) - 2) // self.arity, -1, -1):
+            self._sift_down(i, self._heap[i])
+
+    def push(self, timestamp, evt_type, note):
+        self.pushes += 1
+        self._heap.append(None)
+        self._sift_up(len(self._heap) - 1, (timestamp, evt_type, note))
+
+    def pop(self):
+        if not self._heap:
+            raise IndexError("heap is empty")
+        self.pops += 1
+        root = self._heap[0]
+        last = self._heap.pop()
+        if self._heap:
+            self._sift_down(0, last)
+        return root
+
+    def peek(self):
+        if not self._heap:
+            raise IndexError("heap is empty")
+        return self._heap[0]
+
+    def empty(self):
+        return len(self._heap) == 0
+
+    def reset_counters(self):
+        self.key_comparisons = 0
+        self.swaps = 0
+        self.pushes = 0
+        self.pops = 0
+
+
+class _PlainEventDaryHeap(EventDaryHeap):
+    """ EventDaryHeap(instrumented=False): the same moves in the same order, without counters """
+    instrumented = False
+
+    def _sift_up(self, idx, item, top=0):
+        heap, d = self._heap, self.arity
+        key = item[0]
+        while idx > top:
+            parent = (idx - 1) // d
+            if key < heap[parent][0]:
+                heap[idx] = heap[parent]
+                idx = parent
+            else:
+                break
+        heap[idx] = item
+
+    def _sift_down(self, idx, item):
+        heap, d = self._heap, self.arity
+        n = len(heap)
+        top = idx
+        while True:
+            first = d * idx + 1
+            if first >= n:
+                break
+            smallest, smallest_key = first, heap[first][0]
+            for child in range(first + 1, min(first + d, n)):
+                key = heap[child][0]
+                if key < smallest_key:
+                    smallest, smallest_key = child, key
+            heap[idx] = heap[smallest]
+            idx = smallest
+        self._sift_up(idx, item, top)
+
+    def push(self, timestamp, evt_type, note):
+        self._heap.append(None)
+        self._sift_up(len(self._heap) - 1, (timestamp, evt_type, note))
+
+    def pop(self):
+        heap = self._heap
+        if not heap:
+            raise IndexError("heap is empty")
+        root = heap[0]
+        last = heap.pop()
+        if heap:
+            self._sift_down(0, last)
+        return root
@@ -1,5 +1,12 @@
 class EventMinHeap:
-    def __init__(self):
+    instrumented = True
+
+    def __new__(cls, instrumented=True):
+        if not instrumented:
+            cls = _PlainEventMinHeap
+        return super().__new__(cls)
+
+    def __init__(self, instrumented=True):
         self._heap = []
 
         # counters
@@ -89,3 +96,55 @@ class EventMinHeap:
         self.swaps = 0
         self.pushes = 0
         self.pops = 0
+
+
+class _PlainEventMinHeap(EventMinHeap):
+    """
+    EventMinHeap(instrumented=False): the same swaps in the same order, without counters or helper calls.
+    A subclass rather than a flag, so neither form branches on every comparison.
+    """
+    instrumented = False
+
+    def _heapify_up(self, idx):
+        heap = self._heap
+        while idx > 0:
+            parent = (idx - 1) // 2
+            if heap[idx][0] < heap[parent][0]:
+                heap[parent], heap[idx] = heap[idx], heap[parent]
+                idx = parent
+            else:
+                break
+
+    def _heapify_down(self, idx):
+        heap = self._heap
+        n = len(heap)
+        while True:
+            left = 2 * idx + 1
+            right = left + 1
+            smallest = idx
+
+            if left < n and heap[left][0] < heap[smallest][0]:
+                smallest = left
+            if right < n and heap[right][0] < heap[smallest][0]:
+                smallest = right
+
+            if smallest == idx:
+                break
+
+            heap[idx], heap[smallest] = heap[smallest], heap[idx]
+            idx = smallest
+
+    def push(self, timestamp, evt_type, note):
+        self._heap.append((timestamp, evt_type, note))
+        self._heapify_up(len(self._heap) - 1)
+
+    def pop(self):
+        heap = self._heap
+        if not heap:
+            raise IndexError("heap is empty")
+        root = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._heapify_down(0)
+        return root
@@ -2,6 +2,9 @@ RED = True
 BLACK = False
 
 class RBNode:
+    # No per-node __dict__: a node is a handful of pointers
+    __slots__ = ("timestamp", "evt_type", "note", "color", "left", "right", "parent")
+
     def __init__(self, timestamp=None, evt_type=None, note=None, color=RED, left=None, right=None, parent=None):
         self.timestamp = timestamp
         self.evt_type = evt_type
@@ -12,10 +15,20 @@ class RBNode:
         self.parent = parent
 
 class EventRBTree:
-    def __init__(self):
+    instrumented = True
+
+    def __new__(cls, instrumented=True):
+        if not instrumented:
+            cls = _PlainEventRBTree
+        return super().__new__(cls)
+
+    def __init__(self, instrumented=True):
         self.NIL = RBNode(color=BLACK)
         self.NIL.left = self.NIL.right = self.NIL.parent = self.NIL
         self.root = self.NIL
+        self._min = self.NIL  # Leftmost node, next to pop
+        self._size = 0
+        self._free = []  # Popped nodes, reused by push
 
         # counters
         self.key_comparisons = 0
@@ -67,10 +80,22 @@ class EventRBTree:
         y.parent = x
 
     # ========== insertion ==========
+    def _new_node(self, timestamp, evt_type, note, color):
+        if self._free:
+            node = self._free.pop()
+            node.timestamp, node.evt_type, node.note, node.color = timestamp, evt_type, note, color
+            node.left = node.right = node.parent = self.NIL
+            return node
+        return RBNode(timestamp=timestamp, evt_type=evt_type, note=note, color=color,
+                      left=self.NIL, right=self.NIL, parent=self.NIL)
+
     def push(self, timestamp, evt_type, note):
         self.inserts += 1
-        node = RBNode(timestamp=timestamp, evt_type=evt_type, note=note, color=RED,
-                      left=self.NIL, right=self.NIL, parent=self.NIL)
+        self._size += 1
+        node = self._new_node(timestamp, evt_type, note, RED)
+        # Equal times go right, so the cached minimum only changes on a strictly smaller time
+        if self._min == self.NIL or timestamp < self._min.timestamp:
+            self._min = node
 
         y = self.NIL
         x = self.root
@@ -215,21 +240,69 @@ class EventRBTree:
                     x = self.root
         x.color = BLACK
 
+    # ========== bulk build ==========
+    def build_sorted(self, events):
+        """
+        Replace the contents with time-ordered events in O(n): a balanced tree whose full levels
+        are black and whose partial bottom level is red. No comparisons or rotations are counted.
+        """
+        events = [(timestamp, evt_type, note) for (timestamp, evt_type, note) in events]
+        for i in range(1, len(events)):
+            if events[i][0] < events[i - 1][0]:
+                raise ValueError("build_sorted needs events in time order.")
+
+        n = len(events)
+        red_depth = (n + 1).bit_length() - 1  # Levels above this one are full
+
+        def build(lo, hi, depth, parent):
+            if lo >= hi:
+                return self.NIL
+            mid = (lo + hi) // 2
+            node = self._new_node(*events[mid], RED if depth == red_depth else BLACK)
+            node.parent = parent
+            node.left = build(lo, mid, depth + 1, node)
+            node.right = build(mid + 1, hi, depth + 1, node)
+            return node
+
+        self.root = build(0, n, 0, self.NIL)
+        self._min = self._minimum(self.root) if n else self.NIL
+        self._size = n
+        self.inserts += n
+
     # ========== public methods ==========
     def __len__(self):
-        def _count(node):
-            if node == self.NIL:
-                return 0
-            return 1 + _count(node.left) + _count(node.right)
-        return _count(self.root)
+        return self._size
+
+    def __iter__(self):
+        """ In-order (time-ordered) (timestamp, type, note) tuples, without removing them """
+        node = self._min
+        while node != self.NIL:
+            yield node.timestamp, node.evt_type, node.note
+            node = self._successor(node)
+
+    def _successor(self, node):
+        if node.right != self.NIL:
+            return self._minimum(node.right)
+        parent = node.parent
+        while parent != self.NIL and node == parent.right:
+            node, parent = parent, parent.parent
+        return parent
 
     def pop_next(self):
         if self.root == self.NIL:
             raise IndexError("pop from empty RBTree")
-        node = self._minimum(self.root)
+        node = self._min
+        # Deletion relinks nodes without moving keys, so the successor stays valid
+        self._min = self._successor(node)
         self.deletes += 1
+        self._size -= 1
         self._delete_node(node)
-        return node.timestamp, node.evt_type, node.note
+        event = node.timestamp, node.evt_type, node.note
+
+        # Unlink the node so it holds no cycles, then keep it for reuse
+        node.left = node.right = node.parent = None
+        self._free.append(node)
+        return event
 
     def empty(self) -> bool:
         return self.root == self.NIL
@@ -239,3 +312,74 @@ class EventRBTree:
         self.rotations = 0
         self.inserts = 0
         self.deletes = 0
+
+
+class _PlainEventRBTree(EventRBTree):
+    """ EventRBTree(instrumented=False): the same tree operations, without counters or comparison calls """
+    instrumented = False
+
+    def _left_rotate(self, x):
+        y = x.right
+        x.right = y.left
+        if y.left != self.NIL:
+            y.left.parent = x
+        y.parent = x.parent
+        if x.parent == self.NIL:
+            self.root = y
+        elif x == x.parent.left:
+            x.parent.left = y
+        else:
+            x.parent.right = y
+        y.left = x
+        x.parent = y
+
+    def _right_rotate(self, y):
+        x = y.left
+        y.left = x.right
+        if x.right != self.NIL:
+            x.right.parent = y
+        x.parent = y.parent
+        if y.parent == self.NIL:
+            self.root = x
+        elif y == y.parent.right:
+            y.parent.right = x
+        else:
+            y.parent.left = x
+        x.right = y
+        y.parent = x
+
+    def push(self, timestamp, evt_type, note):
+        self._size += 1
+        node = self._new_node(timestamp, evt_type, note, RED)
+        if self._min == self.NIL or timestamp < self._min.timestamp:
+            self._min = node
+
+        nil = self.NIL
+        y = nil
+        x = self.root
+        while x != nil:
+            y = x
+            # send equal times to the right subtree
+            x = x.left if timestamp < x.timestamp else x.right
+        node.parent = y
+        if y == nil:
+            self.root = node
+        elif timestamp < y.timestamp:
+            y.left = node
+        else:
+            y.right = node
+
+        self._insert_fixup(node)
+
+    def pop_next(self):
+        if self.root == self.NIL:
+            raise IndexError("pop from empty RBTree")
+        node = self._min
+        self._min = self._successor(node)
+        self._size -= 1
+        self._delete_node(node)
+        event = node.timestamp, node.evt_type, node.note
+
+        node.left = node.right = node.parent = None
+        self._free.append(node)
+        return event
@@ -1,7 +1,12 @@
+# Imported first so the startup report covers every import below
+from startup import mark, startup_report, warm_up_model
+
 import os
-import soundfile as sf
 
 from core import *
+from audio_io import DecodedAudio
+from profiler import profiling, stage
+from transcription_cache import TranscriptionCache
 
 from PyQt6 import QtCore, QtWidgets, QtMultimedia
 import pyqtgraph as pg
@@ -9,9 +14,17 @@ import pyqtgraph as pg
 # Run the following command to re-generate updated GUI: pyuic6 src/mainwindow.ui -o src/main_window.py
 from main_window import Ui_MainWindow
 
+mark("modules imported")
+
+# Keep every n-th output sample for the waveform preview
+PREVIEW_STEP = 16
 
 """ ==================== Helper ==================== """
-def plot_data(waveform, data, sr):
+def plot_data(waveform, data, sr=None):
+    """ Plot samples at sr, or the min/max envelope of a DecodedAudio """
+    if isinstance(data, DecodedAudio):
+        data, sr = data.envelope()
+
     scene = QtWidgets.QGraphicsScene()
     waveform.setScene(scene)
 
@@ -40,19 +53,25 @@ def plot_data(waveform, data, sr):
     return scene
 
 class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
+    # Emitted from the warm-up thread, delivered on the GUI thread
+    model_ready = QtCore.pyqtSignal(str)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setupUi(self)
 
         """ ==================== Data ==================== """
         self.INPUT_PATH = ""
-        self.INPUT_DATA = None
+        self.INPUT_AUDIO = None
         self.INPUT_SR = None
+        self.input_buffer = None
         self.OUTPUT_PATH = ""
         self.OUTPUT_DATA = None
         self.OUTPUT_SR = None
         self.OUTPUT_FORMAT = ""
         self.scene = None
+        self.cache = TranscriptionCache()
+        self.profile = None
 
         """ ==================== Audio Player ==================== """
         self.player = QtMultimedia.QMediaPlayer()
@@ -65,6 +84,21 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.input_file_btn.clicked.connect(self.choose_file)
         self.convert_btn.clicked.connect(self.convert)
         self.playpause_btn.clicked.connect(self.play_pause)
+        self.export_profile_btn.clicked.connect(self.export_profile)
+        self.export_trace_btn.clicked.connect(self.export_trace)
+        self.model_ready.connect(self.show_model_status)
+
+    def start_warm_up(self):
+        """ Load the transcription model in the background while the window is already usable """
+        self.statusbar.showMessage("Loading transcription model...")
+        warm_up_model(lambda error: self.model_ready.emit(
+            f"Transcription model failed to load: {error}" if error else "Transcription model ready"))
+
+    def show_model_status(self, message):
+        self.statusbar.showMessage(message, 5000)
+        if self.profile is None:
+            # The Profile tab shows startup timings until the first conversion is profiled
+            self.profile_text.setPlainText(startup_report())
 
     def choose_file(self):
         self.INPUT_PATH, _ = QtWidgets.QFileDialog.getOpenFileName(
@@ -74,9 +108,10 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             "Audio (*.wav *.mp3 *.flac)"
         )
         if self.INPUT_PATH:
-            self.INPUT_DATA, self.INPUT_SR = sf.read(self.INPUT_PATH)
-
-            self.INPUT_DATA = to_mono(self.INPUT_DATA)
+            # Opened once and read lazily, shared by plotting, transcription and playback
+            self.INPUT_AUDIO = DecodedAudio.from_file(self.INPUT_PATH)
+            self.INPUT_SR = self.INPUT_AUDIO.sr
+            self.input_buffer = None
 
             if self.OUTPUT_SR:
                 self.OUTPUT_DATA = None
@@ -85,7 +120,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
             self.input_file_btn.setText(os.path.basename(self.INPUT_PATH))
             self.input_sr.setText(str(self.INPUT_SR))
-            self.length.setText(f"{sec_to_minsec(len(self.INPUT_DATA) / self.INPUT_SR)}")
+            self.length.setText(f"{sec_to_minsec(self.INPUT_AUDIO.duration)}")
             self.convert_btn.setEnabled(True)
 
             self.plot_orig()
@@ -98,33 +133,73 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.OUTPUT_FORMAT = self.output_format.currentText()
         self.OUTPUT_PATH = f"{os.path.splitext(os.path.basename(self.INPUT_PATH))[0]}_8bit{self.OUTPUT_FORMAT}"
 
-        events = to_events(self.INPUT_PATH)
-        self.num_data_points.setText(f"Number of Audio Events (N) = {len(events)}")
+        with profiling(os.path.basename(self.INPUT_PATH)) as self.profile:
+            self.run_conversion()
 
-        sorted_events, runtime, num_of_operation = ds_comparison(events)
+        self.profile_text.setPlainText(self.profile.report())
+        self.export_profile_btn.setEnabled(True)
+        self.export_trace_btn.setEnabled(True)
 
-        self.runtime1.setText(f"Runtime: {runtime[0] * 1000:.2f} ms")
-        self.runtime2.setText(f"Runtime: {runtime[1] * 1000:.2f} ms")
-        self.runtime3.setText(f"Runtime: {runtime[2] * 1000:.2f} ms")
-        self.num_comp_2.setText(f"# comparisons: {num_of_operation[0]}")
-        self.num_swap_2.setText(f"# swaps: {num_of_operation[1]}")
-        self.num_comp_3.setText(f"# comparisons: {num_of_operation[2]}")
-        self.num_rot_3.setText(f"# rotations: {num_of_operation[3]}")
+    def run_conversion(self):
+        """ Transcribe, order, render, preview and optionally compare; every stage is recorded in self.profile """
+        events = to_events(self.INPUT_AUDIO, cache=self.cache, backend=self.backend.currentText())
+        self.num_data_points.setText(f"Number of Audio Events (N) = {len(events)}")
+
+        sorted_events, strategy = order_events(events, self.OUTPUT_SR, self.ordering.currentText())
+        self.statusbar.showMessage(f"Events ordered by {strategy}", 5000)
 
-        self.OUTPUT_DATA = to_8_bit(sorted_events, self.OUTPUT_SR)
+        # Stream the rendition to disk, keeping only a decimated copy for the waveform preview
+        preview = []
+        write_8_bit(self.OUTPUT_PATH, sorted_events, self.OUTPUT_SR,
+                    on_block=lambda block: preview.append(block[::PREVIEW_STEP].copy()))
+        self.OUTPUT_DATA = np.concatenate(preview) if preview else np.zeros(0, dtype=np.float32)
 
-        self.plot_rslt()
+        with stage("preview plot"):
+            self.plot_rslt()
         self.playpause_btn.setEnabled(True)
         self.playpause_btn.setText("Play")
         self.audio_input.setEnabled(True)
 
-        sf.write(self.OUTPUT_PATH, self.OUTPUT_DATA, self.OUTPUT_SR)
+        if self.compare_ds.isChecked():
+            # The output is complete; the comparison only fills the Analysis tab
+            self.show_ds_comparison(events)
+
+    def show_ds_comparison(self, events):
+        runtime, plain_runtime, num_of_operation = ds_comparison(events, self.OUTPUT_SR)
+
+        self.runtime1.setText(f"Runtime: {plain_runtime[0] * 1000:.2f} ms")
+        self.runtime2.setText(f"Runtime: {plain_runtime[1] * 1000:.2f} ms ({runtime[1] * 1000:.2f} ms with counters)")
+        self.runtime3.setText(f"Runtime: {plain_runtime[2] * 1000:.2f} ms ({runtime[2] * 1000:.2f} ms with counters)")
+        self.num_comp_2.setText(f"# comparisons: {num_of_operation[0]}")
+        self.num_swap_2.setText(f"# swaps: {num_of_operation[1]}")
+        self.num_comp_3.setText(f"# comparisons: {num_of_operation[2]}")
+        self.num_rot_3.setText(f"# rotations: {num_of_operation[3]}")
+        self.runtime4.setText(f"Runtime: {plain_runtime[3] * 1000:.2f} ms ({runtime[3] * 1000:.2f} ms with counters)")
+        self.num_comp_4.setText(f"# comparisons: {num_of_operation[4]}")
+        self.num_move_4.setText(f"# moves: {num_of_operation[5]}")
+        self.runtime5.setText(f"Runtime: {plain_runtime[4] * 1000:.2f} ms")
+        self.num_pass_5.setText(f"# passes: {num_of_operation[6]}")
+        self.runtime6.setText(f"Runtime: {plain_runtime[5] * 1000:.2f} ms")
+        self.num_runs_6.setText(f"# sorted runs: {num_of_operation[7]}")
+
+    def export_profile(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Profile", "profile.json", "JSON (*.json)")
+        if path:
+            self.profile.write_json(path)
+            self.statusbar.showMessage(f"Profile written to {path}", 5000)
+
+    def export_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Trace", "trace.json",
+                                                        "Chrome trace (*.json)")
+        if path:
+            self.profile.write_trace(path)
+            self.statusbar.showMessage(f"Trace written to {path} (open in chrome://tracing or ui.perfetto.dev)", 5000)
 
     def plot_orig(self):
-        plot_data(self.waveform_orig, self.INPUT_DATA, self.INPUT_SR)
+        plot_data(self.waveform_orig, self.INPUT_AUDIO)
 
     def plot_rslt(self):
-        self.scene = plot_data(self.waveform_rslt, self.OUTPUT_DATA, self.OUTPUT_SR)
+        self.scene = plot_data(self.waveform_rslt, self.OUTPUT_DATA, self.OUTPUT_SR / PREVIEW_STEP)
 
     def handle_media_status_changed(self, status):
         if status == QtMultimedia.QMediaPlayer.MediaStatus.EndOfMedia:
@@ -132,11 +207,19 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             self.playpause_btn.setChecked(False)
 
     def play_pause(self):
-        if self.audio_input.currentText() == "Original":
-            filepath = self.INPUT_PATH
+        if self.audio_input.currentText() == "Original" and self.INPUT_PATH.lower().endswith(".wav"):
+            # Nothing to decode: play the file itself, at its own channels and resolution
+            self.player.setSource(QtCore.QUrl.fromLocalFile(self.INPUT_PATH))
+        elif self.audio_input.currentText() == "Original":
+            # Play compressed inputs from an in-memory WAV instead of decoding the file again
+            if self.input_buffer is None:
+                self.input_buffer = QtCore.QBuffer()
+                self.input_buffer.setData(QtCore.QByteArray(self.INPUT_AUDIO.wav_bytes()))
+                self.input_buffer.open(QtCore.QIODevice.OpenModeFlag.ReadOnly)
+            self.input_buffer.seek(0)
+            self.player.setSourceDevice(self.input_buffer, QtCore.QUrl("original.wav"))
         else:
-            filepath = self.OUTPUT_PATH
-        self.player.setSource(QtCore.QUrl.fromLocalFile(filepath))
+            self.player.setSource(QtCore.QUrl.fromLocalFile(self.OUTPUT_PATH))
         if self.playpause_btn.isChecked():
             self.playpause_btn.setText("Pause")
             self.player.play()
@@ -150,4 +233,6 @@ def run_gui():
 
     window = MainWindow()
     window.show()
+    mark("window shown")
+    window.start_warm_up()
     app.exec()
@@ -0,0 +1,231 @@
+import threading
+from functools import lru_cache
+from importlib import metadata
+
+import numpy as np
+
+from audio_io import DecodedAudio
+from startup import lazy_import
+
+# Copies of basic_pitch.constants: importing basic_pitch loads its model runtime (TensorFlow/ONNX/...),
+# which is deferred until a model is actually needed
+FFT_HOP = 256
+AUDIO_SAMPLE_RATE = 22050
+ANNOTATIONS_FPS = AUDIO_SAMPLE_RATE // FFT_HOP
+AUDIO_N_SAMPLES = AUDIO_SAMPLE_RATE * 2 - FFT_HOP
+
+# Same windowing as basic_pitch.inference.run_inference
+N_OVERLAPPING_FRAMES = 30
+OVERLAP_LEN = N_OVERLAPPING_FRAMES * FFT_HOP
+HOP_SIZE = AUDIO_N_SAMPLES - OVERLAP_LEN
+
+
+def load_audio(audio_input):
+    """ Mono model-rate (22.05 kHz) samples of a path or an already decoded DecodedAudio """
+    if isinstance(audio_input, DecodedAudio):
+        return audio_input.resampled(AUDIO_SAMPLE_RATE)
+    librosa = lazy_import("librosa")
+    audio, _ = librosa.load(str(audio_input), sr=AUDIO_SAMPLE_RATE, mono=True)
+    return audio
+
+@lru_cache(maxsize=1)
+def model_fingerprint():
+    """
+    Installed basic-pitch version and bundled model, for transcription cache keys.
+    Read from the package metadata: importing basic_pitch loads its model runtimes.
+    """
+    try:
+        version = metadata.version("basic-pitch")
+    except metadata.PackageNotFoundError:
+        version = None
+    return f"basic-pitch {version} icassp_2022"
+
+def default_model_path():
+    """ basic-pitch's bundled ICASSP 2022 model for the installed runtime """
+    return lazy_import("basic_pitch").ICASSP_2022_MODEL_PATH
+
+def _pad(audio):
+    """ Model-rate audio behind the half overlap of silence that basic_pitch puts in front """
+    return np.concatenate([np.zeros(OVERLAP_LEN // 2, dtype=np.float32), audio.astype(np.float32)])
+
+def _window(padded, first, last, offset=0):
+    """
+    Overlapping (n, AUDIO_N_SAMPLES, 1) windows first..last of padded model-rate audio,
+    whose first sample is sample `offset` of the whole padded signal
+    """
+    windows = np.zeros((last - first, AUDIO_N_SAMPLES, 1), dtype=np.float32)
+    for i in range(first, last):
+        chunk = padded[i * HOP_SIZE - offset:i * HOP_SIZE - offset + AUDIO_N_SAMPLES]
+        windows[i - first, :len(chunk), 0] = chunk
+    return windows
+
+def _num_windows(length):
+    return max(1, -(-(length + OVERLAP_LEN // 2) // HOP_SIZE))
+
+def _unwrap(output, original_length):
+    """ Drop the overlapping frames and flatten (n, frames, bins) to (frames, bins) """
+    n_olap = N_OVERLAPPING_FRAMES // 2
+    output = output[:, n_olap:-n_olap, :]
+    n_frames = int(np.floor(original_length * (ANNOTATIONS_FPS / AUDIO_SAMPLE_RATE)))
+    return output.reshape(-1, output.shape[2])[:n_frames, :]
+
+
+class InferenceSession:
+    """
+    basic-pitch model loaded once and kept warm for the lifetime of the process.
+    Windows of several inputs share batches on their way through the network.
+    """
+    def __init__(self, model_path=None, batch_size=32):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                Model = lazy_import("basic_pitch.inference").Model
+                self._model = Model(self.model_path or default_model_path())
+            return self._model
+
+    def warm_up(self):
+        """ Load the model and run one silent window through it """
+        self.model.predict(np.zeros((1, AUDIO_N_SAMPLES, 1), dtype=np.float32))
+
+    def _predict(self, windows):
+        """ Model output for a stack of windows, in batches of batch_size """
+        outputs = {}
+        for i in range(0, len(windows), self.batch_size):
+            for k, v in self.model.predict(windows[i:i + self.batch_size]).items():
+                outputs.setdefault(k, []).append(v)
+        return {k: np.concatenate(v) for k, v in outputs.items()}
+
+    def infer(self, audios):
+        """ Raw model output ({'note', 'onset', 'contour'}) for each model-rate signal """
+        windows = [_window(_pad(audio), 0, _num_windows(len(audio))) for audio in audios]
+        counts = [len(w) for w in windows]
+        outputs = self._predict(np.concatenate(windows))
+
+        results = []
+        offset = 0
+        for audio, count in zip(audios, counts):
+            results.append({k: _unwrap(v[offset:offset + count], len(audio)) for k, v in outputs.items()})
+            offset += count
+        return results
+
+    def transcribe(self, audios, onset_threshold=0.5, frame_threshold=0.3, minimum_note_length=127.70):
+        """ PrettyMIDI transcription of each model-rate signal, like basic_pitch.inference.predict """
+        note_creation = lazy_import("basic_pitch.note_creation")
+        min_note_len = int(np.round(minimum_note_length / 1000 * (AUDIO_SAMPLE_RATE / FFT_HOP)))
+        midis = []
+        for model_output in self.infer(audios):
+            midi_data, _ = note_creation.model_output_to_notes(
+                model_output,
+                onset_thresh=onset_threshold,
+                frame_thresh=frame_threshold,
+                min_note_len=min_note_len,
+            )
+            midis.append(midi_data)
+        return midis
+
+    def stream_notes(self, audio, chunk_windows=16, onset_threshold=0.5, frame_threshold=0.3,
+                     minimum_note_length=127.70, max_pending_windows=64):
+        """
+        Transcribe model-rate audio a chunk of windows at a time. audio may also be a
+        DecodedAudio, which is then resampled block by block as the windows reach it.
+
+        Yields (watermark, notes): notes is a list of (start, end, pitch) in seconds,
+        and no note yielded later starts before watermark. Notes still sounding at the
+        end of the analysed audio are held back and re-analysed together with the next
+        chunk, so notes crossing a chunk boundary come out whole. Notes held for longer
+        than max_pending_windows are cut at that point.
+        """
+        note_creation = lazy_import("basic_pitch.note_creation")
+        min_note_len = int(np.round(minimum_note_length / 1000 * (AUDIO_SAMPLE_RATE / FFT_HOP)))
+        if isinstance(audio, DecodedAudio):
+            length = audio.resampled_length(AUDIO_SAMPLE_RATE)
+            blocks = audio.resampled_blocks(AUDIO_SAMPLE_RATE)
+        else:
+            length, blocks = len(audio), iter([audio])
+        n_windows = _num_windows(length)
+        n_frames = int(np.floor(length * (ANNOTATIONS_FPS / AUDIO_SAMPLE_RATE)))
+        frame_times = note_creation.model_frames_to_time(n_frames + 1)
+        n_olap = N_OVERLAPPING_FRAMES // 2
+
+        buffers = {"note": [], "onset": []}
+        region_start = 0  # Absolute frame of the first buffered frame
+        committed = 0  # Notes starting before this frame have been yielded
+        # Padded model-rate samples from sample `offset` of the whole padded signal on
+        padded, offset = np.zeros(OVERLAP_LEN // 2, dtype=np.float32), 0
+        for first in range(0, n_windows, chunk_windows):
+            last = min(first + chunk_windows, n_windows)
+            pieces, filled = [padded], offset + len(padded)
+            while filled < (last - 1) * HOP_SIZE + AUDIO_N_SAMPLES:
+                block = next(blocks, None)
+                if block is None:
+                    break
+                pieces.append(block.astype(np.float32, copy=False))
+                filled += len(block)
+            padded = np.concatenate(pieces) if len(pieces) > 1 else padded
+            output = self._predict(_window(padded, first, last, offset))
+            # Later chunks start at window `last`: drop what comes before it
+            padded, offset = padded[last * HOP_SIZE - offset:], last * HOP_SIZE
+            for k in buffers:
+                trimmed = output[k][:, n_olap:-n_olap, :]
+                buffers[k].append(trimmed.reshape(-1, trimmed.shape[2]))
+
+            final = first + chunk_windows >= n_windows
+            frames = np.concatenate(buffers["note"])
+            onsets = np.concatenate(buffers["onset"])
+            if final:
+                frames, onsets = frames[:n_frames - region_start], onsets[:n_frames - region_start]
+            available = region_start + len(frames)
+            frames_per_window = trimmed.shape[1]
+            # Notes starting this close to the end may still change with more right context
+            guard = frames_per_window // 2
+
+            notes = note_creation.output_to_notes_polyphonic(
+                frames, onsets,
+                onset_thresh=onset_threshold,
+                frame_thresh=frame_threshold,
+                min_note_len=min_note_len,
+                infer_onsets=True,
+                max_freq=None,
+                min_freq=None,
+                melodia_trick=True,
+            )
+
+            limit = available if final else max(committed, available - guard)
+            held = [start + region_start for start, end, _, _ in notes
+                    if not final and end + region_start >= available - 1 and start + region_start >= committed]
+            if held and available - region_start <= max_pending_windows * frames_per_window:
+                limit = min(limit, min(held))
+
+            ready = []
+            for start, end, pitch, _ in notes:
+                start, end = start + region_start, min(end + region_start, n_frames)
+                if committed <= start < limit and end > start:
+                    ready.append((float(frame_times[start]), float(frame_times[end]), int(pitch)))
+            committed = limit
+
+            # Keep a guard band of left context in front of the next analysis region
+            keep_from = max(region_start, committed - guard)
+            for k in buffers:
+                merged = np.concatenate(buffers[k])[keep_from - region_start:]
+                buffers[k] = [merged]
+            region_start = keep_from
+
+            yield float(frame_times[min(committed, n_frames)]), sorted(ready)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """ Process-wide InferenceSession """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = InferenceSession()
+        return _session
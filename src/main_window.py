@@ -108,11 +108,41 @@ class Ui_MainWindow(object):
         self.target_SR.addItem("")
         self.target_SR.addItem("")
         self.gridLayout_2.addWidget(self.target_SR, 0, 1, 1, 1)
+        self.lable_backend = QtWidgets.QLabel(parent=self.body_config)
+        self.lable_backend.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight|QtCore.Qt.AlignmentFlag.AlignTrailing|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.lable_backend.setObjectName("lable_backend")
+        self.gridLayout_2.addWidget(self.lable_backend, 2, 0, 1, 1)
+        self.backend = QtWidgets.QComboBox(parent=self.body_config)
+        self.backend.setFocusPolicy(QtCore.Qt.FocusPolicy.ClickFocus)
+        self.backend.setPlaceholderText("")
+        self.backend.setObjectName("backend")
+        self.backend.addItem("")
+        self.backend.addItem("")
+        self.gridLayout_2.addWidget(self.backend, 2, 1, 1, 1)
+        self.lable_ordering = QtWidgets.QLabel(parent=self.body_config)
+        self.lable_ordering.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight|QtCore.Qt.AlignmentFlag.AlignTrailing|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.lable_ordering.setObjectName("lable_ordering")
+        self.gridLayout_2.addWidget(self.lable_ordering, 3, 0, 1, 1)
+        self.ordering = QtWidgets.QComboBox(parent=self.body_config)
+        self.ordering.setFocusPolicy(QtCore.Qt.FocusPolicy.ClickFocus)
+        self.ordering.setObjectName("ordering")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.ordering.addItem("")
+        self.gridLayout_2.addWidget(self.ordering, 3, 1, 1, 1)
         self.verticalLayout_4.addWidget(self.body_config)
         self.footer = QtWidgets.QWidget(parent=self.tab_config)
         self.footer.setObjectName("footer")
         self.horizontalLayout_5 = QtWidgets.QHBoxLayout(self.footer)
         self.horizontalLayout_5.setObjectName("horizontalLayout_5")
+        self.compare_ds = QtWidgets.QCheckBox(parent=self.footer)
+        self.compare_ds.setFocusPolicy(QtCore.Qt.FocusPolicy.ClickFocus)
+        self.compare_ds.setObjectName("compare_ds")
+        self.horizontalLayout_5.addWidget(self.compare_ds)
         self.convert_btn = QtWidgets.QPushButton(parent=self.footer)
         self.convert_btn.setEnabled(False)
         self.convert_btn.setFocusPolicy(QtCore.Qt.FocusPolicy.ClickFocus)
@@ -256,7 +286,112 @@ class Ui_MainWindow(object):
         self.verticalLayout_5.addWidget(self.num_rot_3)
         self.horizontalLayout_8.addWidget(self.run3)
         self.verticalLayout_3.addWidget(self.ds3)
+        self.hline4 = QtWidgets.QFrame(parent=self.tab_analysis)
+        self.hline4.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.hline4.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.hline4.setObjectName("hline4")
+        self.verticalLayout_3.addWidget(self.hline4)
+        self.ds4 = QtWidgets.QWidget(parent=self.tab_analysis)
+        self.ds4.setObjectName("ds4")
+        self.horizontalLayout_9 = QtWidgets.QHBoxLayout(self.ds4)
+        self.horizontalLayout_9.setObjectName("horizontalLayout_9")
+        self.label_ds4 = QtWidgets.QLabel(parent=self.ds4)
+        self.label_ds4.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeading|QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_ds4.setObjectName("label_ds4")
+        self.horizontalLayout_9.addWidget(self.label_ds4)
+        self.run4 = QtWidgets.QWidget(parent=self.ds4)
+        self.run4.setObjectName("run4")
+        self.verticalLayout_7 = QtWidgets.QVBoxLayout(self.run4)
+        self.verticalLayout_7.setObjectName("verticalLayout_7")
+        self.runtime4 = QtWidgets.QLabel(parent=self.run4)
+        self.runtime4.setObjectName("runtime4")
+        self.verticalLayout_7.addWidget(self.runtime4)
+        self.num_comp_4 = QtWidgets.QLabel(parent=self.run4)
+        self.num_comp_4.setObjectName("num_comp_4")
+        self.verticalLayout_7.addWidget(self.num_comp_4)
+        self.num_move_4 = QtWidgets.QLabel(parent=self.run4)
+        self.num_move_4.setObjectName("num_move_4")
+        self.verticalLayout_7.addWidget(self.num_move_4)
+        self.horizontalLayout_9.addWidget(self.run4)
+        self.verticalLayout_3.addWidget(self.ds4)
+        self.hline5 = QtWidgets.QFrame(parent=self.tab_analysis)
+        self.hline5.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.hline5.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.hline5.setObjectName("hline5")
+        self.verticalLayout_3.addWidget(self.hline5)
+        self.ds5 = QtWidgets.QWidget(parent=self.tab_analysis)
+        self.ds5.setObjectName("ds5")
+        self.horizontalLayout_10 = QtWidgets.QHBoxLayout(self.ds5)
+        self.horizontalLayout_10.setObjectName("horizontalLayout_10")
+        self.label_ds5 = QtWidgets.QLabel(parent=self.ds5)
+        self.label_ds5.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeading|QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_ds5.setObjectName("label_ds5")
+        self.horizontalLayout_10.addWidget(self.label_ds5)
+        self.run5 = QtWidgets.QWidget(parent=self.ds5)
+        self.run5.setObjectName("run5")
+        self.verticalLayout_8 = QtWidgets.QVBoxLayout(self.run5)
+        self.verticalLayout_8.setObjectName("verticalLayout_8")
+        self.runtime5 = QtWidgets.QLabel(parent=self.run5)
+        self.runtime5.setObjectName("runtime5")
+        self.verticalLayout_8.addWidget(self.runtime5)
+        self.num_pass_5 = QtWidgets.QLabel(parent=self.run5)
+        self.num_pass_5.setObjectName("num_pass_5")
+        self.verticalLayout_8.addWidget(self.num_pass_5)
+        self.horizontalLayout_10.addWidget(self.run5)
+        self.verticalLayout_3.addWidget(self.ds5)
+        self.hline6 = QtWidgets.QFrame(parent=self.tab_analysis)
+        self.hline6.setFrameShape(QtWidgets.QFrame.Shape.HLine)
+        self.hline6.setFrameShadow(QtWidgets.QFrame.Shadow.Sunken)
+        self.hline6.setObjectName("hline6")
+        self.verticalLayout_3.addWidget(self.hline6)
+        self.ds6 = QtWidgets.QWidget(parent=self.tab_analysis)
+        self.ds6.setObjectName("ds6")
+        self.horizontalLayout_12 = QtWidgets.QHBoxLayout(self.ds6)
+        self.horizontalLayout_12.setObjectName("horizontalLayout_12")
+        self.label_ds6 = QtWidgets.QLabel(parent=self.ds6)
+        self.label_ds6.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeading|QtCore.Qt.AlignmentFlag.AlignLeft|QtCore.Qt.AlignmentFlag.AlignVCenter)
+        self.label_ds6.setObjectName("label_ds6")
+        self.horizontalLayout_12.addWidget(self.label_ds6)
+        self.run6 = QtWidgets.QWidget(parent=self.ds6)
+        self.run6.setObjectName("run6")
+        self.verticalLayout_10 = QtWidgets.QVBoxLayout(self.run6)
+        self.verticalLayout_10.setObjectName("verticalLayout_10")
+        self.runtime6 = QtWidgets.QLabel(parent=self.run6)
+        self.runtime6.setObjectName("runtime6")
+        self.verticalLayout_10.addWidget(self.runtime6)
+        self.num_runs_6 = QtWidgets.QLabel(parent=self.run6)
+        self.num_runs_6.setObjectName("num_runs_6")
+        self.verticalLayout_10.addWidget(self.num_runs_6)
+        self.horizontalLayout_12.addWidget(self.run6)
+        self.verticalLayout_3.addWidget(self.ds6)
         self.tabWidget.addTab(self.tab_analysis, "")
+        self.tab_profile = QtWidgets.QWidget()
+        self.tab_profile.setObjectName("tab_profile")
+        self.verticalLayout_9 = QtWidgets.QVBoxLayout(self.tab_profile)
+        self.verticalLayout_9.setObjectName("verticalLayout_9")
+        self.profile_text = QtWidgets.QPlainTextEdit(parent=self.tab_profile)
+        font = QtGui.QFont()
+        font.setFamily("Monospace")
+        self.profile_text.setFont(font)
+        self.profile_text.setReadOnly(True)
+        self.profile_text.setObjectName("profile_text")
+        self.verticalLayout_9.addWidget(self.profile_text)
+        self.profile_footer = QtWidgets.QWidget(parent=self.tab_profile)
+        self.profile_footer.setObjectName("profile_footer")
+        self.horizontalLayout_11 = QtWidgets.QHBoxLayout(self.profile_footer)
+        self.horizontalLayout_11.setObjectName("horizontalLayout_11")
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.horizontalLayout_11.addItem(spacerItem1)
+        self.export_profile_btn = QtWidgets.QPushButton(parent=self.profile_footer)
+        self.export_profile_btn.setEnabled(False)
+        self.export_profile_btn.setObjectName("export_profile_btn")
+        self.horizontalLayout_11.addWidget(self.export_profile_btn)
+        self.export_trace_btn = QtWidgets.QPushButton(parent=self.profile_footer)
+        self.export_trace_btn.setEnabled(False)
+        self.export_trace_btn.setObjectName("export_trace_btn")
+        self.horizontalLayout_11.addWidget(self.export_trace_btn)
+        self.verticalLayout_9.addWidget(self.profile_footer)
+        self.tabWidget.addTab(self.tab_profile, "")
         self.horizontalLayout.addWidget(self.tabWidget)
         MainWindow.setCentralWidget(self.centralwidget)
         self.statusbar = QtWidgets.QStatusBar(parent=MainWindow)
@@ -288,6 +423,18 @@ class Ui_MainWindow(object):
         self.target_SR.setItemText(0, _translate("MainWindow", "22050"))
         self.target_SR.setItemText(1, _translate("MainWindow", "44100"))
         self.target_SR.setItemText(2, _translate("MainWindow", "48000"))
+        self.lable_backend.setText(_translate("MainWindow", "Transcription"))
+        self.backend.setItemText(0, _translate("MainWindow", "basic-pitch"))
+        self.backend.setItemText(1, _translate("MainWindow", "yin"))
+        self.lable_ordering.setText(_translate("MainWindow", "Event Ordering"))
+        self.ordering.setItemText(0, _translate("MainWindow", "auto"))
+        self.ordering.setItemText(1, _translate("MainWindow", "list.sort"))
+        self.ordering.setItemText(2, _translate("MainWindow", "min-heap"))
+        self.ordering.setItemText(3, _translate("MainWindow", "red-black tree"))
+        self.ordering.setItemText(4, _translate("MainWindow", "4-ary heap"))
+        self.ordering.setItemText(5, _translate("MainWindow", "radix sort"))
+        self.ordering.setItemText(6, _translate("MainWindow", "timsort"))
+        self.compare_ds.setText(_translate("MainWindow", "Compare data structures"))
         self.convert_btn.setText(_translate("MainWindow", "Start Converting >>"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_config), _translate("MainWindow", "Config"))
         self.audio_input.setItemText(0, _translate("MainWindow", "Original"))
@@ -307,4 +454,18 @@ class Ui_MainWindow(object):
         self.runtime3.setText(_translate("MainWindow", "Runtime: -- ms"))
         self.num_comp_3.setText(_translate("MainWindow", "# comparisons: --"))
         self.num_rot_3.setText(_translate("MainWindow", "# rotations: --"))
+        self.label_ds4.setText(_translate("MainWindow", "DS 4: 4-ary Min-Heap (hole-based)"))
+        self.runtime4.setText(_translate("MainWindow", "Runtime: -- ms"))
+        self.num_comp_4.setText(_translate("MainWindow", "# comparisons: --"))
+        self.num_move_4.setText(_translate("MainWindow", "# moves: --"))
+        self.label_ds5.setText(_translate("MainWindow", "DS 5: Radix Sort (sample ticks)"))
+        self.runtime5.setText(_translate("MainWindow", "Runtime: -- ms"))
+        self.num_pass_5.setText(_translate("MainWindow", "# passes: --"))
+        self.label_ds6.setText(_translate("MainWindow", "DS 6: Timsort (sample ticks)"))
+        self.runtime6.setText(_translate("MainWindow", "Runtime: -- ms"))
+        self.num_runs_6.setText(_translate("MainWindow", "# sorted runs: --"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_analysis), _translate("MainWindow", "Analysis"))
+        self.profile_text.setPlainText(_translate("MainWindow", "Convert a file to see where the time went."))
+        self.export_profile_btn.setText(_translate("MainWindow", "Export JSON..."))
+        self.export_trace_btn.setText(_translate("MainWindow", "Export Trace..."))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_profile), _translate("MainWindow", "Profile"))
@@ -0,0 +1,105 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Analysis defaults at the model rate (22.05 kHz): 46 ms frames every 11.6 ms
+FRAME_LENGTH = 1024
+HOP_LENGTH = 256
+
+def _frames(audio, frame_length, hop_length):
+    """ (n, frame_length) strided view of audio with frame t centred on sample t * hop_length """
+    audio = np.concatenate([np.zeros(frame_length // 2), np.asarray(audio, dtype=np.float64)])
+    pad = frame_length - len(audio) if len(audio) < frame_length else -(len(audio) - frame_length) % hop_length
+    audio = np.concatenate([audio, np.zeros(pad)])
+    return sliding_window_view(audio, frame_length)[::hop_length]
+
+def _cmnd(frames, max_tau):
+    """
+    YIN cumulative mean normalized difference of each frame for lags 0..max_tau,
+    with the difference function computed through the FFT.
+    """
+    frame_length = frames.shape[1]
+    window = frame_length - max_tau
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + window)))
+
+    # acf[t, tau] = sum_{j < window} x[j] * x[j + tau]
+    spectrum = np.fft.rfft(frames, n_fft) * np.conj(np.fft.rfft(frames[:, :window], n_fft))
+    acf = np.fft.irfft(spectrum, n_fft)[:, :max_tau + 1]
+
+    energy = np.cumsum(np.concatenate([np.zeros((len(frames), 1)), frames ** 2], axis=1), axis=1)
+    shifted = energy[:, window:window + max_tau + 1] - energy[:, :max_tau + 1]
+    diff = np.maximum(energy[:, window:window + 1] + shifted - 2 * acf, 0)
+
+    cmnd = np.ones_like(diff)
+    running = np.cumsum(diff[:, 1:], axis=1)
+    np.divide(diff[:, 1:] * np.arange(1, max_tau + 1), running, out=cmnd[:, 1:], where=running > 0)
+    return cmnd
+
+def yin(audio, sr, fmin=55.0, fmax=1760.0, threshold=0.15, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH,
+        silence_db=-50.0, chunk_frames=2048):
+    """
+    Frame-wise fundamental frequency of the dominant voice.
+    Returns f0 in Hz per frame, 0 where the frame is silent or unvoiced.
+    """
+    max_tau = min(int(sr / fmin), frame_length // 2)
+    min_tau = max(2, int(sr / fmax))
+    frames = _frames(audio, frame_length, hop_length)
+    f0 = np.zeros(len(frames))
+
+    # Chunks bound the (frames x FFT size) working set on long inputs
+    for first in range(0, len(frames), chunk_frames):
+        chunk = frames[first:first + chunk_frames]
+        cmnd = _cmnd(chunk, max_tau)
+
+        # First dip below the threshold that is also a local minimum, else the global minimum
+        lags = cmnd[:, min_tau:max_tau]
+        below = (lags < threshold) & (lags <= cmnd[:, min_tau + 1:max_tau + 1])
+        tau = np.where(below.any(axis=1), below.argmax(axis=1), lags.argmin(axis=1)) + min_tau
+        rows = np.arange(len(chunk))
+        voiced = cmnd[rows, tau] < threshold
+
+        # Parabolic interpolation around the chosen lag
+        left, mid, right = cmnd[rows, tau - 1], cmnd[rows, tau], cmnd[rows, tau + 1]
+        curvature = left - 2 * mid + right
+        shift = np.divide(left - right, 2 * curvature, out=np.zeros(len(chunk)), where=curvature > 0)
+        period = tau + np.clip(shift, -1, 1)
+
+        rms_db = 10 * np.log10(np.mean(chunk ** 2, axis=1) + 1e-12)
+        voiced &= rms_db > silence_db
+        f0[first:first + len(chunk)] = np.where(voiced, sr / period, 0.0)
+    return f0
+
+def f0_to_midi(f0):
+    """ Nearest MIDI note of each frequency, -1 where f0 is 0 """
+    midi = np.full(len(f0), -1, dtype=np.int64)
+    voiced = f0 > 0
+    midi[voiced] = np.clip(np.round(69 + 12 * np.log2(f0[voiced] / 440.0)), 0, 127)
+    return midi
+
+def _median_filter(values, size):
+    """ Running median of odd width size, edges padded with the edge value """
+    if size <= 1 or len(values) < size:
+        return values
+    padded = np.pad(values, size // 2, mode='edge')
+    return np.median(sliding_window_view(padded, size), axis=1).astype(values.dtype)
+
+def yin_notes(audio, sr, minimum_note_length=127.70, smoothing=5, **yin_params):
+    """
+    Monophonic transcription: YIN pitch per frame, rounded to MIDI notes,
+    median-smoothed and cut into notes of at least minimum_note_length ms.
+    Returns parallel arrays (starts, ends, pitches), times in seconds.
+    """
+    hop_length = yin_params.get("hop_length", HOP_LENGTH)
+    midi = _median_filter(f0_to_midi(yin(audio, sr, **yin_params)), smoothing)
+    if not len(midi):
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    # Run-length encode the note track
+    changes = np.flatnonzero(np.diff(midi)) + 1
+    starts = np.concatenate([[0], changes])
+    ends = np.concatenate([changes, [len(midi)]])
+    pitches = midi[starts]
+
+    min_frames = minimum_note_length / 1000 * sr / hop_length
+    keep = (pitches >= 0) & (ends - starts >= min_frames)
+    frame_time = hop_length / sr
+    return starts[keep] * frame_time, ends[keep] * frame_time, pitches[keep]
@@ -0,0 +1,161 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# The Profile that stage() records into, per thread and task
+_current = contextvars.ContextVar("profile", default=None)
+
+def _peak_rss():
+    """ Resident set size high-water mark of this process in bytes, or None where unknown """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+def _reset_peak_rss():
+    """ Restart the high-water mark at the current RSS (Linux); returns whether it could """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+class Profile:
+    """
+    Wall time, CPU time and peak resident memory of the stages of one conversion.
+
+    Stages nest; a stage entered several times (e.g. once per output block) adds up in the
+    report, while the trace keeps every interval. CPU time is the whole process's, so it
+    exceeds wall time while worker threads run. Where the high-water mark cannot be reset
+    (everywhere but Linux), a stage's peak is the process's peak so far.
+
+    Stages may be recorded from several threads (e.g. a background encoder); each thread
+    nests its own stages and gets its own track in the trace. RSS is per process, so the
+    peaks of overlapping stages on different threads are approximate.
+    """
+    def __init__(self, name="conversion"):
+        self.name = name
+        # (path of stage labels, start, wall, cpu, peak RSS, thread name), start in seconds from creation
+        self.spans = []
+        self._t0 = time.perf_counter()
+        self._local = threading.local()  # .stack: labels of the stages open on this thread
+        self._open = {}  # id -> [highest peak seen before a reset] of every open stage, on any thread
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, label):
+        """ Record the enclosed code as stage label, nested in the stages still open on this thread """
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(label)
+        path = tuple(stack)
+        frame = [None]
+        with self._lock:
+            # The reset below forgets the peak every open stage, on every thread, has reached so far
+            peak = _peak_rss()
+            if peak is not None:
+                for other in self._open.values():
+                    other[0] = max(other[0] or 0, peak)
+            _reset_peak_rss()
+            self._open[id(frame)] = frame
+
+        start, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu
+            stack.pop()
+            with self._lock:
+                del self._open[id(frame)]
+                peak = _peak_rss()
+                if peak is not None and frame[0] is not None:
+                    peak = max(peak, frame[0])
+                self.spans.append((path, start - self._t0, wall, cpu, peak, threading.current_thread().name))
+
+    def totals(self):
+        """ Per stage path, in order of first entry: (calls, wall, cpu, peak RSS) """
+        totals = {}
+        for path, start, wall, cpu, peak, _ in sorted(self.spans, key=lambda span: span[1]):
+            calls, wall_sum, cpu_sum, peak_max = totals.get(path, (0, 0.0, 0.0, None))
+            if peak is not None:
+                peak_max = peak if peak_max is None else max(peak_max, peak)
+            totals[path] = (calls + 1, wall_sum + wall, cpu_sum + cpu, peak_max)
+        return totals
+
+    def report(self, width=58):
+        """ Stages as a text table: nested stages indented under the stage they ran in """
+        label_width = width - 30
+        lines = [f"{'Stage':<{label_width}}{'Wall':>10}{'CPU':>10}{'Peak RSS':>10}"]
+        for path, (calls, wall, cpu, peak) in self.totals().items():
+            label = '  ' * (len(path) - 1) + path[-1] + (f" ×{calls}" if calls > 1 else '')
+            memory = f"{peak / 2 ** 20:.0f} MB" if peak is not None else "--"
+            lines.append(f"{label[:label_width]:<{label_width}}{wall * 1000:>8.0f}ms{cpu * 1000:>8.0f}ms{memory:>10}")
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        """ JSON-serializable summary and every recorded interval """
+        return {
+            "name": self.name,
+            "stages": [dict(stage='/'.join(path), calls=calls, wall=wall, cpu=cpu, peak_rss=peak)
+                       for path, (calls, wall, cpu, peak) in self.totals().items()],
+            "spans": [dict(stage='/'.join(path), start=start, wall=wall, cpu=cpu, peak_rss=peak, thread=thread)
+                      for path, start, wall, cpu, peak, thread in self.spans],
+        }
+
+    def chrome_trace(self):
+        """ The intervals in Chrome trace-event format (chrome://tracing, Perfetto) """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        tids = {}  # thread name -> track, in order of first span
+        for path, start, wall, cpu, peak, thread in sorted(self.spans, key=lambda span: (span[1], len(span[0]))):
+            if thread not in tids:
+                tids[thread] = len(tids)
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[thread],
+                               "args": {"name": thread}})
+            events.append({"name": path[-1], "cat": "stage", "ph": "X", "pid": pid, "tid": tids[thread],
+                           "ts": start * 1e6, "dur": wall * 1e6,
+                           "args": {"cpu_ms": cpu * 1000,
+                                    "peak_rss_mb": None if peak is None else peak / 2 ** 20}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+@contextmanager
+def profiling(name="conversion"):
+    """ Make a new Profile the one stage() records into while the block runs """
+    profile = Profile(name)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+def stage(label):
+    """
+    Record the enclosed code as a stage of the active Profile; does nothing outside profiling().
+    Threads start without an active Profile: run them in contextvars.copy_context() to record theirs.
+    """
+    profile = _current.get()
+    return nullcontext() if profile is None else profile.stage(label)
@@ -0,0 +1,64 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Reference point for the startup report: the first import of this module
+_T0 = time.perf_counter()
+
+_lock = threading.Lock()
+_marks = []  # (label, seconds since _T0)
+_imports = []  # (module, seconds spent importing it)
+
+def mark(label):
+    """ Record that a startup milestone (e.g. 'prompt shown') was reached """
+    with _lock:
+        _marks.append((label, time.perf_counter() - _T0))
+
+def lazy_import(name):
+    """ Import a heavy module on first use, recording how long the import took """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        _imports.append((name, time.perf_counter() - t0))
+    return module
+
+def warm_up_model(on_done=None):
+    """
+    Load the basic-pitch model on a daemon thread, so the first transcription does not pay for it.
+    on_done is called from that thread with None, or with the exception if warm-up failed.
+    """
+    def run():
+        error = None
+        os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")  # Keep TensorFlow's start-up logs off the console
+        try:
+            from inference import get_session
+            get_session().warm_up()
+            mark("model warmed up")
+        except Exception as e:
+            error = e
+            mark(f"model warm-up failed ({type(e).__name__})")
+        if on_done is not None:
+            on_done(error)
+
+    thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def startup_report(width=58):
+    """ Startup milestones and lazily imported modules as a text table """
+    with _lock:
+        marks, imports = list(_marks), list(_imports)
+    lines = [" Startup Time ".center(width, '=')]
+    for label, t in marks:
+        lines.append(f"{label:<{width - 10}}{t * 1000:>8.0f}ms")
+    lines.append(" Lazy imports (on first use) ".center(width, '-'))
+    if not imports:
+        lines.append("none yet".center(width))
+    for name, t in sorted(imports, key=lambda x: -x[1]):
+        lines.append(f"{name:<{width - 10}}{t * 1000:>8.0f}ms")
+    return '\n'.join(lines)
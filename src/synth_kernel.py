@@ -0,0 +1,64 @@
+from functools import lru_cache
+from importlib.util import find_spec
+
+import numpy as np
+
+from startup import lazy_import
+
+# numba itself is only imported when the kernel is first needed (installed is not yet importable)
+HAVE_NUMBA = find_spec("numba") is not None
+
+
+def _render_events(ticks, types, pitches, freqs, sr, out):
+    """
+    Square-wave synthesis straight into a preallocated output array.
+
+    ticks/types/pitches are parallel event arrays (sample boundary, 1 = Note ON / 0 = Note OFF,
+    MIDI pitch). Every voice starts at phase 0 on Note ON and keeps a continuous phase until
+    its Note OFF, like the segment renderer in core.
+    """
+    phase = np.zeros(128)
+    active = np.zeros(128, dtype=np.bool_)
+    current = 0
+
+    for i in range(len(ticks)):
+        tick = ticks[i]
+        if tick > current:
+            for p in range(128):
+                if active[p]:
+                    inc = freqs[p] / sr
+                    ph = phase[p]
+                    for n in range(current, tick):
+                        # 8-Bit Square Wave, volume scaled to 0.5
+                        if ph < 0.5:
+                            out[n] += 0.5
+                        else:
+                            out[n] -= 0.5
+                        ph += inc
+                        if ph >= 1.0:
+                            ph -= 1.0
+                    phase[p] = ph
+            current = tick
+
+        p = pitches[i]
+        if types[i] == 1:  # Note ON
+            if not active[p]:
+                active[p] = True
+                phase[p] = 0.0  # Start phase at 0
+        else:  # Note OFF
+            active[p] = False
+
+    return out
+
+
+@lru_cache(maxsize=1)
+def get_render_events():
+    """ The JIT-compiled _render_events, or None without a working numba """
+    if not HAVE_NUMBA:
+        return None
+    try:
+        numba = lazy_import("numba")
+    except ImportError:
+        return None  # Installed but broken, e.g. built for another NumPy
+    # cache=True stores the compiled kernel on disk, so the JIT cost is paid once per install
+    return numba.njit(cache=True, nogil=True)(_render_events)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from event_array import EVENT_DTYPE, EventArray
+
+# One row per event, EventArray columns plus the instrument: 8 + 1 + 1 + 2 = 12 bytes
+ENTRY_DTYPE = np.dtype(EVENT_DTYPE.descr + [("channel", "<u2")])
+
+# A temporary file this old was left behind by a failed store, not one in progress
+STALE_TMP_SECONDS = 3600
+
+def default_cache_dir():
+    """ $XDG_CACHE_HOME/8-bit-converter/transcriptions, or ~/.cache/... """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "8-bit-converter", "transcriptions")
+
+
+class TranscriptionCache:
+    """
+    Disk cache of transcribed events keyed by the input's content hash and the
+    transcription parameters, with a size budget and least-recently-used eviction.
+    Several processes (e.g. batch workers) may share a directory: an entry another process
+    evicts meanwhile is simply a miss.
+    """
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, input_path, **params):
+        """ SHA-256 of the file content plus the sorted transcription parameters """
+        digest = hashlib.sha256()
+        with open(input_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def load(self, key):
+        """ Cached per-channel EventArrays, or None on a miss """
+        path = self._path(key)
+        try:
+            table = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            pass  # Evicted by another process since loading
+
+        if not len(table):
+            return []
+        channels = []
+        for channel in range(int(table["channel"].max()) + 1):
+            rows = table[table["channel"] == channel]
+            events = np.empty(len(rows), dtype=EVENT_DTYPE)
+            for field in EVENT_DTYPE.names:
+                events[field] = rows[field]
+            channels.append(EventArray(events))
+        return channels
+
+    def store(self, key, channels):
+        """ Save per-channel EventArrays, then evict down to the size budget """
+        os.makedirs(self.directory, exist_ok=True)
+        table = np.empty(sum(len(events) for events in channels), dtype=ENTRY_DTYPE)
+        offset = 0
+        for channel, events in enumerate(channels):
+            rows = table[offset:offset + len(events)]
+            for field in EVENT_DTYPE.names:
+                rows[field] = events.data[field]
+            rows["channel"] = channel
+            offset += len(events)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, table, allow_pickle=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def _files(self, suffix):
+        """ (mtime, size, path) of the files ending in suffix, oldest first; files removed meanwhile are skipped """
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(suffix):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another process since listing
+                files.append((st.st_mtime, st.st_size, path))
+        return sorted(files)
+
+    def entries(self):
+        """ (mtime, size, path) of every cache entry, least recently used first """
+        return self._files(".npy")
+
+    def _stale_tmp(self):
+        """ Temporary files of stores that failed without cleaning up (e.g. a killed process) """
+        return [(mtime, size, path) for mtime, size, path in self._files(".tmp")
+                if mtime < time.time() - STALE_TMP_SECONDS]
+
+    def evict(self):
+        """
+        Remove stale temporary files, then least recently used entries until the cache,
+        including stores in progress, fits in max_bytes
+        """
+        for _, _, path in self._stale_tmp():
+            _remove(path)
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries + self._files(".tmp"))
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries() + self._stale_tmp():
+            _remove(path)
+
+
+def _remove(path):
+    """ os.remove, where another process removing the file first is fine """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,179 @@
+from functools import lru_cache
+
+import numpy as np
+
+from wavetable import MIDI_FREQS
+
+# NES-style APU layout: 2 pulse + 1 triangle + 1 noise
+NES_CHANNELS = ("pulse", "pulse", "triangle", "noise")
+
+# Output level per channel type
+CHANNEL_GAINS = {"pulse": 0.5, "triangle": 0.5, "noise": 0.25}
+
+# RMS level per channel type: a triangle's RMS is 1/sqrt(3) of its peak, a square's and noise's are their peak
+CHANNEL_RMS = {"pulse": 0.5, "triangle": 0.5 / np.sqrt(3), "noise": 0.25}
+
+# Channel types that play transcribed pitches; noise only plays notes mapped to percussion
+PITCHED_CHANNELS = ("pulse", "triangle")
+
+STEAL_POLICIES = ("oldest", "lowest", "quietest")
+
+def parse_channels(spec):
+    """
+    Parse a channel layout: 'nes', a channel count (all pulse),
+    or a comma-separated list of channel types, e.g. 'pulse,pulse,triangle'.
+    """
+    spec = spec.strip().lower()
+    if spec == "nes":
+        return NES_CHANNELS
+    if spec.isdigit():
+        if int(spec) < 1:
+            raise ValueError("Channel count must be at least 1.")
+        return ("pulse",) * int(spec)
+    channels = tuple(c.strip() for c in spec.split(','))
+    for c in channels:
+        if c not in CHANNEL_GAINS:
+            raise ValueError(f"Unknown channel type '{c}'. "
+                             f"Available choices: {', '.join(CHANNEL_GAINS)}")
+    return channels
+
+def parse_percussion(spec):
+    """
+    Parse the MIDI pitches played on noise channels: comma-separated pitches
+    and inclusive ranges, e.g. '35-51' or '36,38,42-46'.
+    """
+    pitches = set()
+    for part in spec.split(','):
+        part = part.strip()
+        lo, _, hi = part.partition('-')
+        try:
+            lo, hi = int(lo), int(hi or lo)
+        except ValueError:
+            raise ValueError(f"Invalid percussion pitch '{part}'. Expected e.g. '36,38,42-46'.")
+        if not 0 <= lo <= hi <= 127:
+            raise ValueError(f"Percussion pitches must be ascending MIDI pitches 0-127, got '{part}'.")
+        pitches.update(range(lo, hi + 1))
+    return frozenset(pitches)
+
+def a_weighting(freqs):
+    """ IEC 61672 A-weighting as a linear gain: how loud a tone of each frequency sounds """
+    f2 = np.asarray(freqs, dtype=np.float64) ** 2
+    gain = (12194.0 ** 2 * f2 ** 2
+            / ((f2 + 20.6 ** 2) * np.sqrt((f2 + 107.7 ** 2) * (f2 + 737.9 ** 2)) * (f2 + 12194.0 ** 2)))
+    return gain * 10 ** (2.0 / 20)  # 0 dB at 1 kHz
+
+PITCH_LOUDNESS = a_weighting(MIDI_FREQS)
+
+
+class VoicePool:
+    """
+    Fixed number of hardware-style channels with voice stealing.
+    Transcribed pitches play on the pulse and triangle channels; noise channels only play
+    the pitches in percussion (if there is no noise channel, those play as pitched notes).
+    """
+    def __init__(self, channels=NES_CHANNELS, policy="oldest", percussion=()):
+        if policy not in STEAL_POLICIES:
+            raise ValueError(f"Unknown voice-stealing policy '{policy}'. "
+                             f"Available choices: {', '.join(STEAL_POLICIES)}")
+        self.channels = tuple(channels)
+        self.policy = policy
+        self.percussion = frozenset(percussion)
+        self.rms = np.array([CHANNEL_RMS[c] for c in self.channels])
+
+        pitched = np.array([c in PITCHED_CHANNELS for c in self.channels], dtype=bool)
+        self.pitched_slots = np.flatnonzero(pitched)
+        self.noise_slots = np.flatnonzero(~pitched)
+        if not len(self.pitched_slots) and not (self.percussion and len(self.noise_slots)):
+            raise ValueError("Channel layout has no pulse or triangle channel for pitched notes.")
+
+        # Per-channel state, -1 = free
+        self.pitch = np.full(len(self.channels), -1, dtype=np.int64)
+        self.start = np.zeros(len(self.channels), dtype=np.int64)
+
+        # counters
+        self.steals = 0
+
+    def _victim(self, slots):
+        """ Channel of slots to steal when all of them are busy """
+        if self.policy == "oldest":
+            return int(slots[np.argmin(self.start[slots])])
+        if self.policy == "lowest":
+            return int(slots[np.argmin(self.pitch[slots])])
+        # quietest: the voice that sounds softest right now (channel level at its pitch), ties broken by age
+        levels = self.rms[slots] * PITCH_LOUDNESS[self.pitch[slots]]
+        return int(slots[np.lexsort((self.start[slots], levels))[0]])
+
+    def allocate(self, ticks, events):
+        """
+        Assign sorted events to channels.
+        Returns (starts, ends, pitches, channel_indices) of the rendered note spans.
+        """
+        self.pitch.fill(-1)
+        self.start.fill(0)
+        starts, ends, pitches, slots = [], [], [], []
+
+        def close(slot, tick):
+            if tick > self.start[slot]:
+                starts.append(int(self.start[slot]))
+                ends.append(tick)
+                pitches.append(int(self.pitch[slot]))
+                slots.append(slot)
+            self.pitch[slot] = -1
+
+        for tick, (_, event_type, note_pitch) in zip(ticks.tolist(), events):
+            playing = np.flatnonzero(self.pitch == note_pitch)
+            if event_type == 1:  # Note ON
+                if len(playing):
+                    continue
+                eligible = self.pitched_slots
+                if note_pitch in self.percussion and len(self.noise_slots):
+                    eligible = self.noise_slots
+                if not len(eligible):
+                    continue  # Pitched note with only noise channels to play it on
+                free = eligible[self.pitch[eligible] < 0]
+                if len(free):
+                    slot = int(free[0])
+                else:
+                    slot = self._victim(eligible)
+                    self.steals += 1
+                    close(slot, tick)
+                self.pitch[slot] = note_pitch
+                self.start[slot] = tick
+            else:  # Note OFF
+                if len(playing):
+                    close(int(playing[0]), tick)
+
+        return (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                np.array(pitches, dtype=np.int64), np.array(slots, dtype=np.int64))
+
+
+""" ==================== Channel waveforms ==================== """
+def triangle_span(pitch, offset, num_samples, sr):
+    """ 4-bit stepped triangle (32-step sequence 15..0, 0..15) """
+    phase = np.arange(offset, offset + num_samples) * (MIDI_FREQS[pitch] / sr)
+    step = (phase * 32).astype(np.int64) % 32
+    level = np.abs(15.5 - step) - 0.5  # 15 -> 0 -> 15
+    return (level / 7.5 - 1.0) * CHANNEL_GAINS["triangle"]
+
+@lru_cache(maxsize=1)
+def _lfsr_sequence():
+    """ One period of the 15-bit noise LFSR (taps 0 and 1) as +-1 """
+    reg = 1
+    bits = np.empty(32767)
+    for i in range(32767):
+        feedback = (reg ^ (reg >> 1)) & 1
+        reg = (reg >> 1) | (feedback << 14)
+        bits[i] = 1.0 if reg & 1 else -1.0
+    bits.flags.writeable = False
+    return bits
+
+def noise_span(pitch, offset, num_samples, sr):
+    """ LFSR noise clocked at 16x the note frequency, so higher notes sound brighter """
+    clock = np.arange(offset, offset + num_samples) * (16 * MIDI_FREQS[pitch] / sr)
+    return _lfsr_sequence()[clock.astype(np.int64) % 32767] * CHANNEL_GAINS["noise"]
+
+# Channel type -> span waveform; pulse channels use the engine's own oscillator
+CHANNEL_WAVEFORMS = {
+    "triangle": triangle_span,
+    "noise": noise_span,
+}
@@ -0,0 +1,163 @@
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from batch import _convert_job, collect_inputs, output_path_for
+
+# Kept in the output directory, so a restarted watcher skips the files it already converted
+STATE_FILE = ".8bit_watch_state.json"
+
+def _signature(path):
+    """ What identifies one version of a file: (size, modification time in ns) """
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _partial_path(output_path):
+    """ Hidden sibling an output is written to before it is moved into place (keeps the extension for soundfile) """
+    root, ext = os.path.splitext(output_path)
+    return os.path.join(os.path.dirname(output_path), f".{os.path.basename(root)}.partial{ext}")
+
+class WatchState:
+    """
+    Inputs the watcher has finished, persisted as JSON: name -> signature, output and error.
+    A file counts as finished while its signature is unchanged and its output still exists;
+    a failed file is not retried until it changes.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass  # First run, or a damaged file: start over
+
+    def is_done(self, name, signature):
+        entry = self.entries.get(name)
+        return (entry is not None and entry["signature"] == signature
+                and (entry["error"] is not None or os.path.exists(entry["output"])))
+
+    def record(self, name, signature, result):
+        self.entries[name] = {"signature": signature, "output": result["output"], "error": result["error"]}
+        self.save()
+
+    def save(self):
+        """ Write to a temporary file, then move it over the state, so a crash never leaves half a file """
+        partial = self.path + ".partial"
+        with open(partial, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(partial, self.path)
+
+def _ignore_interrupt():
+    """ Worker initializer: Ctrl+C reaches the whole process group, but only the watcher should stop on it """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _watch_job(input_path, output_path, sr, use_cache, threads, backend, ordering, render):
+    """ _convert_job writing to a partial file that only replaces output_path once complete """
+    partial = _partial_path(output_path)
+    result = _convert_job(input_path, partial, sr, use_cache, threads, backend, ordering, render)
+    result["output"] = output_path
+    try:
+        if result["error"] is None:
+            os.replace(partial, output_path)
+        elif os.path.exists(partial):
+            os.remove(partial)
+    except OSError as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+def watch(input_dir, output_dir, output_format, sr, workers=None, max_pending=None, interval=1.0, settle=2.0,
+          use_cache=True, threads=None, backend="basic-pitch", ordering="auto", on_queued=None, on_result=None,
+          stop=None, **render):
+    """
+    Convert every new or changed audio file in input_dir until stop (a threading.Event) is set
+    or the process is interrupted.
+
+    input_dir is polled every `interval` seconds. A file is queued once its size and
+    modification time have not changed for `settle` seconds, so files still being copied in
+    are left alone. At most max_pending files (default: twice the workers) are in the process
+    pool at a time; the others wait in the directory until a slot frees up, so a burst of
+    files never grows the queue. Outputs appear under their final name only when complete.
+    On interrupt, running conversions finish and queued ones are dropped, to be picked up
+    again on the next start. Hidden files are never converted, and neither are *_8bit
+    outputs when output_dir is input_dir, so the watcher does not feed on its own outputs.
+
+    on_queued(input_path) and on_result(result) report progress, with results as in run_batch.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    same_dir = os.path.samefile(input_dir, output_dir)
+    state = WatchState(os.path.join(output_dir, STATE_FILE))
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2 * workers
+
+    # Outputs of conversions interrupted by a crash are never completed
+    for name in os.listdir(output_dir):
+        if name.startswith('.') and ".partial." in name:
+            os.remove(os.path.join(output_dir, name))
+
+    first_seen = {}  # name -> (signature, when it was first seen with that signature)
+    running = {}  # future -> (name, signature)
+
+    def collect(futures):
+        for future in futures:
+            name, signature = running.pop(future)
+            try:
+                result = future.result()
+            except Exception:
+                continue  # Cancelled or the worker died: not finished, so retried on the next start
+            state.record(name, signature, result)
+            first_seen.pop(name, None)
+            if on_result is not None:
+                on_result(result)
+
+    # Spawned for the same reason as in run_batch: forked workers can hang on the warm-up's model lock
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupt,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    try:
+        while stop is None or not stop.is_set():
+            now = time.monotonic()
+            busy = {name for name, _ in running.values()}
+            for input_path in collect_inputs(input_dir):
+                if len(running) >= max_pending:
+                    break  # Backpressure: the rest stays in the directory until a slot frees up
+                name = os.path.basename(input_path)
+                # Hidden (e.g. partial) files and, watching the output directory, its outputs are not inputs
+                if name.startswith('.') or (same_dir and os.path.splitext(name)[0].endswith("_8bit")):
+                    continue
+                try:
+                    signature = _signature(input_path)
+                except FileNotFoundError:
+                    continue  # Removed since listing
+                if name in busy or state.is_done(name, signature):
+                    continue
+
+                # Debounce: wait until the file has stopped changing
+                seen = first_seen.get(name)
+                if seen is None or seen[0] != signature:
+                    first_seen[name] = (signature, now)
+                    continue
+                if now - seen[1] < settle:
+                    continue
+
+                output_path = output_path_for(input_path, output_dir, output_format)
+                future = executor.submit(_watch_job, input_path, output_path, sr, use_cache, threads, backend,
+                                         ordering, render)
+                running[future] = (name, signature)
+                if on_queued is not None:
+                    on_queued(input_path)
+
+            if running:
+                done, _ = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+                collect(done)
+            else:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=True)
+        collect(list(running))
@@ -0,0 +1,53 @@
+from functools import lru_cache
+
+import numpy as np
+
+TABLE_SIZE = 4096  # must be a power of two
+
+# MIDI pitch -> frequency (Hz)
+MIDI_FREQS = 440.0 * (2.0 ** ((np.arange(128) - 69) / 12.0))
+
+@lru_cache(maxsize=4)
+def wavetable_bank(sr, size=TABLE_SIZE):
+    """
+    Band-limited single-cycle square wave tables, one row per MIDI pitch (0-127).
+
+    Each row is the Fourier series of a square wave truncated to the odd harmonics
+    below Nyquist for that pitch, so lookups never alias. Banks are cached per
+    (sample rate, table size) and shared across conversions.
+    """
+    x = np.arange(size) / size
+    nyquist = sr / 2.0
+
+    # Number of odd harmonics (1, 3, 5, ...) below Nyquist for each pitch
+    num_harmonics = np.maximum(((nyquist / MIDI_FREQS) + 1) // 2, 1).astype(np.int64)
+
+    bank = np.empty((128, size))
+    acc = np.zeros(size)
+    order = np.argsort(num_harmonics)
+    next_pitch = 0
+    for h in range(1, int(num_harmonics.max()) + 1):
+        k = 2 * h - 1
+        acc += np.sin(2 * np.pi * k * x) / k
+        # Every pitch whose harmonic count is now complete takes a snapshot
+        while next_pitch < 128 and num_harmonics[order[next_pitch]] == h:
+            bank[order[next_pitch]] = acc * (4 / np.pi)
+            next_pitch += 1
+
+    bank.flags.writeable = False
+    return bank
+
+def phase_increment(freq, sr):
+    """ 32-bit fixed-point phase increment for a frequency: one full cycle is 2**32 """
+    return np.uint32(round(freq / sr * 2 ** 32) % 2 ** 32)
+
+def render_wavetable(table, num_samples, inc, phase=0):
+    """ Render a voice by indexing a single-cycle table with a fixed-point phase accumulator """
+    shift = 32 - int(np.log2(len(table)))
+    # uint32 arithmetic wraps around, which is exactly the phase wrap-around
+    acc = np.arange(num_samples, dtype=np.uint32)
+    acc *= np.uint32(inc)
+    if phase:
+        acc += np.uint32(phase)
+    acc >>= shift
+    return table[acc]